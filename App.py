@@ -1,462 +1,523 @@
-# app.py
-from __future__ import annotations
-import streamlit as st
-from config import ACTIVE_PROJECTS, PERIOD_LABELS
-from youtrack_queries import get_task_counts_by_type_and_state
-from youtrack_queries import yt_issues_url
-import plotly.graph_objects as go
-from datetime import date
-from youtrack_queries import get_monthly_task_counts_by_type
-import calendar
-from chart_theme import apply_chart_theme
-from youtrack_queries import get_deployments_on_live
-import os
-from datetime import datetime
-from youtrack_queries import get_tasks_in_business_review
-
-
-
-
-
-st.set_page_config(page_title="YouTrack Dashboard", layout="wide")
-
-
-with open("styles.css", "r", encoding="utf-8") as f:
-    st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
-
-
-#______________________Section 1 STARTS___________________________________________________________________
-#  Header
-st.markdown('<h1 class="heading--page">YouTrack Dashboard</h1>', unsafe_allow_html=True)
-
-# ---- Defaults from session (persist last submitted) ----
-_default_project = st.session_state.get("selected_project", ACTIVE_PROJECTS[0])
-_default_period_key = st.session_state.get("selected_period_key", list(PERIOD_LABELS.keys())[0])
-_default_period_label = PERIOD_LABELS[_default_period_key]
-
-# ---- Controls----
-with st.form("filters_form", clear_on_submit=False):
-    c1, c2, c3 = st.columns([1, 1, 5])
-    with c1:
-        st.markdown('<div class="label">Project</div>', unsafe_allow_html=True)
-        project_choice = st.selectbox(
-            "Project",
-            ACTIVE_PROJECTS,
-            index=ACTIVE_PROJECTS.index(_default_project),
-            label_visibility="collapsed",
-            key="project_select",
-        )
-    with c2:
-        st.markdown('<div class="label">Period</div>', unsafe_allow_html=True)
-        labels = list(PERIOD_LABELS.values())
-        keys = list(PERIOD_LABELS.keys())
-        idx = labels.index(_default_period_label)
-        selected_label = st.selectbox(
-            "Period",
-            labels,
-            index=idx,
-            label_visibility="collapsed",
-            key="period_select",
-        )
-        period_key_choice = keys[labels.index(selected_label)]
-    with c3:
-        st.markdown('<div class="spacer-20"></div>', unsafe_allow_html=True)
-        submitted = st.form_submit_button("Send")
-
-    if submitted:
-        st.session_state.selected_project = project_choice
-        st.session_state.selected_period_key = period_key_choice
-        st.session_state.filters_submitted = True
-
-# ---- Gate the rest of the dashboard until user clicks Send ----
-if not st.session_state.get("filters_submitted", False):
-    st.markdown("""
-    <div class="empty-hero">
-      <div class="box">
-        <div class="title">Load the Dashboard</div>
-        <div class="sub">Choose a <b>Project</b> and <b>Period</b>, then click <b>Send</b> to fetch data.</div>
-      </div>
-    </div>
-    """, unsafe_allow_html=True)
-    st.stop()
-
-# Use last submitted filters
-project = st.session_state["selected_project"]
-period_key = st.session_state["selected_period_key"]
-
-# Now that data will load, show note + separator
-st.markdown('<div class="smallnote">*Summary is based on Task Created in Given Period</div>', unsafe_allow_html=True)
-st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-
-# --- Fancy loader helper for the cards (status chip + shimmer cards) ---
-def render_cards_loader(label: str, count: int = 6) -> str:
-    head = (
-        "<div class='chip chip--status'><div class='dot'></div>"
-        f"<div>{label}</div></div>"
-    )
-
-    cards_html = []
-    for _ in range(count):
-        cards_html.append(
-            "<div class='skel-card'>"
-            "  <div class='h'></div>"
-            "  <div class='line'></div>"
-            "  <div class='line'></div>"
-            "  <div class='line'></div>"
-            "</div>"
-        )
-    return head + "<div class='skel-cards'>" + "".join(cards_html) + "</div>"
-
-# Show loader immediately in a stable placeholder
-sec1 = st.empty()
-with sec1.container():
-    st.markdown(render_cards_loader("Loading summary…"), unsafe_allow_html=True)
-
-# Fetch while loader is visible
-data = get_task_counts_by_type_and_state(period_key)
-type_map = data.get("per_project", {}).get(project, {}) or {}
-
-# Replace loader with real cards
-sec1.empty()
-with sec1.container():
-    cards = ['<div class="row">']
-    if not type_map:
-        cards.append('<div class="muted">No tasks found for the selected Project/Period.</div>')
-    else:
-        for typ, states in sorted(type_map.items(), key=lambda kv: (-sum(kv[1].values()), kv[0])):
-            total = sum(states.values())
-
-            # Per-state clickable lines
-            state_lines = "<br>".join(
-                f'-) <a class="state-link" href="{yt_issues_url(project, period_key, issue_type=typ, state=s)}" target="_blank">{s}: <span class="state-count">{n}</span></a>'
-                for s, n in sorted(states.items(), key=lambda kv: (-kv[1], kv[0]))
-            )
-
-            # Type label clickable (links to all tasks of that type for period)
-            type_href = yt_issues_url(project, period_key, issue_type=typ)
-            cards.append(
-                f"<div class='card'>"
-                f"  <h4>"
-                f"    <a class='chip-link type-label' href='{type_href}' target='_blank'>{typ}:</a>"
-                f"    <span class='chip chip--count'>{total}</span>"
-                f"  </h4>"
-                f"  <div class='muted'>{state_lines}</div>"
-                f"</div>"
-            )
-    cards.append("</div>")
-    st.markdown("".join(cards), unsafe_allow_html=True)
-    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-#______________________Section 1 ENDS_____________________________________________________________________
-
-
-
-
-#______________________Section 2 STARTS___________________________________________________________________
-st.markdown('<div class="mt-10"></div>', unsafe_allow_html=True)
-st.markdown('<h2 class="heading--section">Tasks Created Per Month in Current Year (by Type)</h2>', unsafe_allow_html=True)
-
-#loader
-def render_chart_loader(label: str) -> str:
-    head = (
-        "<div class='chip chip--status'><div class='dot'></div>"
-        f"<div>{label}</div></div>"
-    )
-
-    # 12 month placeholders (compact)
-    months = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-    bars = "".join(f"<div class='skel-bar' title='{m}'></div>" for m in months)
-    return head + "<div class='skel-chart'>" + bars + "</div>"
-
-sec2 = st.empty()
-with sec2.container():
-    st.markdown(render_chart_loader("Loading monthly counts…"), unsafe_allow_html=True)
-
-#Fetch while loader is visible
-year = date.today().year
-current_month = date.today().month
-monthly_data = get_monthly_task_counts_by_type(project, year)  # YouTrack API call  :contentReference[oaicite:2]{index=2}
-
-#Replace loader with final chart
-sec2.empty()
-with sec2.container():
-    if not monthly_data:
-        st.markdown('<div class="muted">No data available for this year.</div>', unsafe_allow_html=True)
-    else:
-        months = [f"{year}-{m:02d}" for m in range(1, current_month + 1)]
-        month_labels = [calendar.month_abbr[m] for m in range(1, current_month + 1)]
-        all_types = sorted({t for m in monthly_data.values() for t in m})
-
-        # Fixed colors for common types + rotating fallback palette
-        TYPE_COLORS = {
-            "Bug": "#e74c3c",
-            "New Requirement": "#0748B1",
-            "Change Request": "#07B176",
-        }
-        PALETTE = ["#146f91", "#075066", "#9b59b6", "#f39c12", "#34495e", "#1abc9c", "#f38942", "#7f8c8d"]
-        palette_idx = 0
-
-        fig = go.Figure()
-        for t in all_types:
-            vals = [monthly_data.get(m, {}).get(t, 0) for m in months]
-            labels = [str(v) if v > 0 else "" for v in vals]
-
-            color = TYPE_COLORS.get(t)
-            if not color:
-                color = PALETTE[palette_idx % len(PALETTE)]
-                palette_idx += 1
-
-            fig.add_bar(
-                name=t, x=month_labels, y=vals,
-                text=labels, textposition="outside",
-                marker_color=color, hoverinfo="skip", hovertemplate=None
-            )
-
-        fig.update_layout(
-            barmode="group",
-            xaxis=dict(type="category", categoryorder="array", categoryarray=month_labels),
-            showlegend=True,
-        )
-
-        fig = apply_chart_theme(
-            fig,
-            show_bar_text=True,
-            bar_text_color="#111",
-            bar_text_size=11,
-            height=320,
-            margin_t=50,
-            margin_b=0,
-            legend_orientation="v",
-            legend_x=1.02, legend_y=1, legend_xanchor="left", legend_yanchor="top",
-        )
-
-        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-        st.plotly_chart(fig, use_container_width=True)
-        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-#______________________Section 2 ENDS_____________________________________________________________________
-
-
-
-# ______________________ Section 3 STARTS ______________________________________
-
-
-#loader
-def render_section_loader(label: str) -> str:
-    head = (
-        "<div class='chip chip--status'><div class='dot'></div>"
-        f"<div>{label}</div></div>"
-    )
-
-    header = "<div class='skel-head'>Preparing table…</div>"
-    rows = []
-    for _ in range(6):  # 6 preview rows
-        cells = "".join("<div class='cell'></div>" for _ in range(7))
-        rows.append(f"<div class='skel-row'>{cells}</div>")
-    return head + "<div class='skel'>" + header + "".join(rows) + "</div>"
-
-st.markdown('<div class="mt-10"></div>', unsafe_allow_html=True)
-st.markdown('<h2 class="heading--section">Deployments</h2>', unsafe_allow_html=True)
-st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-
-# Stable mount point + immediate custom loader
-sec3 = st.empty()
-with sec3.container():
-    st.markdown(render_section_loader("Loading deployments…"), unsafe_allow_html=True)
-
-#Run while loader is visible
-resp = get_deployments_on_live(project, period_key, link_types={"relates","subtask"})
-deployments = resp.get("deployments", []) or []
-
-#Replace loader with final UI
-sec3.empty()
-with sec3.container():
-    # Flatten rows and build quick stats
-    rows = []
-    type_counts = {}
-    total_tasks = 0
-    for dep in deployments:
-        dep_id = dep.get("deployment_id")
-        dep_due = dep.get("due_date")
-        for li in dep.get("linked", []):
-            total_tasks += 1
-            t = (li.get("type") or "Unspecified").strip()
-            type_counts[t] = type_counts.get(t, 0) + 1
-            rows.append({
-                "deployment_id": dep_id,
-                "task_id": li.get("id"),
-                "title": li.get("title") or "",
-                "type": t,
-                "state": li.get("state") or "",
-                "created_on": li.get("created_on") or "",
-                "deployed_on": dep_due or "",
-            })
-
-    # --- KPI strip (centered) ---
-    def _pill(label, value):
-        return f"<div class='kpi__pill'><b>{label}:</b> {value}</div>"
-
-    preferred = [
-        "Bug", "Change Request", "New Requirement", "Enhancement",
-        "System Understanding", "Tech Task", "Exceptional Cases",
-        "External Dependency", "End User Mistake",
-    ]
-    present_types = list(type_counts.keys())
-    ordered = [t for t in preferred if t in present_types] + \
-              sorted(t for t in present_types if t not in preferred)
-
-    kpis = [
-        _pill("Total Deployments", len(deployments)),
-        _pill("Deployed Tasks", total_tasks),
-    ]
-    for t in ordered:
-        kpis.append(_pill(t, type_counts.get(t, 0)))
-
-    st.markdown("<div class='kpi'>" + "".join(kpis) + "</div>", unsafe_allow_html=True)
-    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-
-    # Build YouTrack links
-    base = os.getenv("YOUTRACK_URL", "").rstrip("/")
-    def issue_link(key: str) -> str:
-        return f"{base}/issue/{key}" if (base and key) else "#"
-
-    # Sort rows by deployed_on desc, then task_id
-    def _parse_date(d):
-        try:
-            return datetime.strptime(d, "%Y-%m-%d")
-        except Exception:
-            return datetime.min
-    rows_sorted = sorted(rows, key=lambda r: (_parse_date(r["deployed_on"]), r["task_id"] or ""), reverse=True)
-
-    # Render table
-    table_html = [
-        "<div class='table-wrap'>",
-        "<table class='table table--sticky table--compact'>",
-        "<thead><tr>",
-        "<th>Deployment ID</th><th>Task ID</th><th>Title</th><th>Type</th><th>State</th><th>Created On</th><th>Deployed On</th>",
-        "</tr></thead>",
-        "<tbody>",
-    ]
-
-    for r in rows_sorted:
-        dep_href = issue_link(r["deployment_id"])
-        task_href = issue_link(r["task_id"])
-        table_html.append(
-            "<tr>"
-            f"<td><a class='state-link' href='{dep_href}' target='_blank'>{r['deployment_id'] or ''}</a></td>"
-            f"<td><a class='state-link' href='{task_href}' target='_blank'>{r['task_id'] or ''}</a></td>"
-            f"<td>{r['title'] or ''}</td>"
-            f"<td>{r['type'] or ''}</td>"
-            f"<td>{r['state'] or ''}</td>"
-            f"<td>{r['created_on'] or ''}</td>"
-            f"<td>{r['deployed_on'] or ''}</td>"
-            "</tr>"
-        )
-
-    if not rows_sorted:
-        table_html.append("<tr><td colspan='7' class='muted'>No deployments found for this Project/Period.</td></tr>")
-
-    table_html.append("</tbody></table>")
-    table_html.append("</div>")
-    st.markdown("".join(table_html), unsafe_allow_html=True)
-    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-# ______________________ Section 3 ENDS ______________________________________
-
-
-# ______________________ Section 4 STARTS ______________________________________
-
-def render_section_loader(label: str) -> str:
-    # (reuses your existing function name if shared; if duplicate, remove this)
-    head = (
-        "<div class='chip chip--status'><div class='dot'></div>"
-        f"<div>{label}</div></div>"
-    )
-    header = "<div class='skel-head'>Preparing table…</div>"
-    rows = []
-    for _ in range(6):  # 6 preview rows
-        cells = "".join("<div class='cell'></div>" for _ in range(5))
-        rows.append(f"<div class='skel-row'>{cells}</div>")
-    return head + "<div class='skel'>" + header + "".join(rows) + "</div>"
-
-st.markdown('<div class="mt-10"></div>', unsafe_allow_html=True)
-st.markdown('<h2 class="heading--section">Tasks in Business Review</h2>', unsafe_allow_html=True)
-st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-
-sec4 = st.empty()
-with sec4.container():
-    st.markdown(render_section_loader("Loading business review…"), unsafe_allow_html=True)
-
-# Fetch while loader is visible (no period filter here)
-br_resp = get_tasks_in_business_review(project)
-br_items = br_resp.get("items", []) or []
-
-# Replace loader with final UI
-sec4.empty()
-with sec4.container():
-    # KPIs (same structure/order as Section 3)
-    type_counts = {}
-    for it in br_items:
-        t = (it.get("type") or "Unspecified").strip()
-        type_counts[t] = type_counts.get(t, 0) + 1
-
-    def _pill(label, value):
-        return f"<div class='kpi__pill'><b>{label}:</b> {value}</div>"
-
-    preferred = [
-        "Bug", "Change Request", "New Requirement", "Enhancement",
-        "System Understanding", "Tech Task", "Exceptional Cases",
-        "External Dependency", "End User Mistake",
-    ]
-    present = list(type_counts.keys())
-    ordered = [t for t in preferred if t in present] + sorted(t for t in present if t not in preferred)
-
-    kpis = [
-        _pill("Total BR Tasks", len(br_items)),
-    ] + [_pill(t, type_counts.get(t, 0)) for t in ordered]
-
-    st.markdown("<div class='kpi'>" + "".join(kpis) + "</div>", unsafe_allow_html=True)
-    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-
-    # Build YouTrack base for links
-    base = os.getenv("YOUTRACK_URL", "").rstrip("/")
-    def issue_link(key: str) -> str:
-        return f"{base}/issue/{key}" if (base and key) else "#"
-
-    # Table
-    table_html = [
-        "<div class='table-wrap'>",
-        "<table class='table table--compact'>",
-        "<thead><tr>",
-        "<th>Task ID</th><th>Title</th><th>Type</th><th>State</th><th>Created On</th>",
-        "</tr></thead>",
-        "<tbody>",
-    ]
-
-    if not br_items:
-        table_html.append("<tr><td colspan='5' class='muted'>No Business Review tasks found for this Project.</td></tr>")
-    else:
-        # Sort: newest first (by created_on), then Task ID
-        def _parse_date(d):
-            try:
-                return datetime.strptime(d or "", "%Y-%m-%d")
-            except Exception:
-                return datetime.min
-        items_sorted = sorted(br_items, key=lambda r: (_parse_date(r.get('created_on')), r.get('id') or ""), reverse=True)
-
-        for it in items_sorted:
-            href = issue_link(it.get("id"))
-            title = (it.get("title") or "").replace("&","&amp;").replace("<","&lt;").replace(">","&gt;")
-            table_html.append(
-                "<tr>"
-                f"<td><a class='state-link' href='{href}' target='_blank'>{it.get('id','')}</a></td>"
-                f"<td>{title}</td>"
-                f"<td>{it.get('type','')}</td>"
-                f"<td>{it.get('state','')}</td>"
-                f"<td>{it.get('created_on','')}</td>"
-                "</tr>"
-            )
-
-    table_html.append("</tbody></table>")
-    table_html.append("</div>")
-    st.markdown("".join(table_html), unsafe_allow_html=True)
-    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-
-# ______________________ Section 4 ENDS ______________________________________
+# app.py
+from __future__ import annotations
+import html
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from io import StringIO
+from itertools import cycle
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from chart_theme import apply_chart_theme, TYPE_COLORS, FALLBACK_PALETTE
+from config import ACTIVE_PROJECTS, PERIOD_LABELS, MAX_CHART_TYPES, KPI_TYPE_ORDER
+from period_utils import MONTH_ABBR, get_month_keys
+from youtrack_queries import (
+    get_deployments_on_live,
+    get_monthly_task_counts_by_type,
+    get_task_counts_by_type_and_state,
+    get_tasks_in_business_review,
+    yt_issues_url_builder,
+)
+
+
+# Page config persists in the browser across reruns; set it once per session
+if "_booted" not in st.session_state:
+    st.set_page_config(page_title="YouTrack Dashboard", layout="wide")
+    st.session_state._booted = True
+
+
+@st.cache_data(show_spinner=False)
+def _load_css(path: str, mtime: float) -> str:
+    # mtime is only part of the cache key, so edits to the file are picked up
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+st.markdown(f"<style>{_load_css('styles.css', os.path.getmtime('styles.css'))}</style>", unsafe_allow_html=True)
+
+
+# ---- Cached YouTrack fetches (avoid refetching on every rerun) ----
+# Task counts and monthly counts are cached in youtrack_queries (5 min TTL,
+# refreshed in the background past half of it). A second TTL layer here would
+# expire together with that one and always block on a full fetch, so these two
+# only read through; the results are not mutated below.
+def _cached_task_counts(period_key: str) -> dict:
+    return get_task_counts_by_type_and_state(period_key)
+
+def _cached_monthly(project: str, year: int) -> dict:
+    return get_monthly_task_counts_by_type(project, year)
+
+@st.cache_data(ttl=120, show_spinner=False)
+def _cached_deps(project: str, period_key: str, link_types: tuple[str, ...]) -> dict:
+    # link_types is passed as a tuple so it can be hashed into the cache key
+    return get_deployments_on_live(project, period_key, link_types=set(link_types))
+
+@st.cache_data(ttl=120, show_spinner=False)
+def _cached_business_review(project: str) -> dict:
+    return get_tasks_in_business_review(project)
+
+
+# ---- YouTrack issue links (specialised once: no per-row base check) ----
+YT_BASE = os.getenv("YOUTRACK_URL", "").rstrip("/")
+issue_link = (lambda key: f"{YT_BASE}/issue/{key}") if YT_BASE else (lambda key: "#")
+
+# ---- Per-session memo keyed by the submitted filters ----
+_SESSION_TTL = 300  # seconds, same window as the task-count cache
+
+def _session_get(store_key: str, key: tuple):
+    """
+    Return the value stored under st.session_state[store_key][key] if it is
+    younger than _SESSION_TTL, else None. Checked before the fetches are
+    submitted, so a session that returns to a (project, period) pair skips
+    both the fetch and the rebuild for that section.
+    """
+    hit = st.session_state.get(store_key, {}).get(key)
+    if hit is not None and time.time() - hit[0] < _SESSION_TTL:
+        return hit[1]
+    return None
+
+def _session_put(store_key: str, key: tuple, value):
+    st.session_state.setdefault(store_key, {})[key] = (time.time(), value)
+    return value
+
+
+#______________________Section 1 STARTS___________________________________________________________________
+#  Header
+st.markdown('<h1 class="heading--page">YouTrack Dashboard</h1>', unsafe_allow_html=True)
+
+# ---- Defaults from session (persist last submitted) ----
+_default_project = st.session_state.get("selected_project", ACTIVE_PROJECTS[0])
+_default_period_key = st.session_state.get("selected_period_key", list(PERIOD_LABELS.keys())[0])
+_default_period_label = PERIOD_LABELS[_default_period_key]
+
+# ---- Controls----
+with st.form("filters_form", clear_on_submit=False):
+    c1, c2, c3 = st.columns([1, 1, 5])
+    with c1:
+        st.markdown('<div class="label">Project</div>', unsafe_allow_html=True)
+        project_choice = st.selectbox(
+            "Project",
+            ACTIVE_PROJECTS,
+            index=ACTIVE_PROJECTS.index(_default_project),
+            label_visibility="collapsed",
+            key="project_select",
+        )
+    with c2:
+        st.markdown('<div class="label">Period</div>', unsafe_allow_html=True)
+        labels = list(PERIOD_LABELS.values())
+        keys = list(PERIOD_LABELS.keys())
+        idx = labels.index(_default_period_label)
+        selected_label = st.selectbox(
+            "Period",
+            labels,
+            index=idx,
+            label_visibility="collapsed",
+            key="period_select",
+        )
+        period_key_choice = keys[labels.index(selected_label)]
+    with c3:
+        st.markdown('<div class="spacer-20"></div>', unsafe_allow_html=True)
+        submitted = st.form_submit_button("Send")
+
+    if submitted:
+        st.session_state.selected_project = project_choice
+        st.session_state.selected_period_key = period_key_choice
+        st.session_state.filters_submitted = True
+
+# ---- Gate the rest of the dashboard until user clicks Send ----
+if not st.session_state.get("filters_submitted", False):
+    st.markdown("""
+    <div class="empty-hero">
+      <div class="box">
+        <div class="title">Load the Dashboard</div>
+        <div class="sub">Choose a <b>Project</b> and <b>Period</b>, then click <b>Send</b> to fetch data.</div>
+      </div>
+    </div>
+    """, unsafe_allow_html=True)
+    st.stop()
+
+# Use last submitted filters
+project = st.session_state["selected_project"]
+period_key = st.session_state["selected_period_key"]
+year = date.today().year
+current_month = date.today().month
+
+# Sections this session already rendered for these filters (no fetch needed)
+cards_memo = _session_get("_cards_html", (project, period_key))
+deps_memo = _session_get("_deps_rows", (project, period_key))
+
+# Fire the remaining YouTrack fetches concurrently; each section below
+# keeps its loader up until its own future resolves.
+_executor = ThreadPoolExecutor(max_workers=4)
+f_counts = _executor.submit(_cached_task_counts, period_key) if cards_memo is None else None
+f_monthly = _executor.submit(_cached_monthly, project, year)
+f_deps = _executor.submit(_cached_deps, project, period_key, ("relates", "subtask")) if deps_memo is None else None
+f_br = _executor.submit(_cached_business_review, project)
+_executor.shutdown(wait=False)
+
+# Now that data will load, show note + separator
+st.markdown('<div class="smallnote">*Summary is based on Task Created in Given Period</div>', unsafe_allow_html=True)
+st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+# --- Fancy loader helper for the cards (status chip + shimmer cards) ---
+def render_cards_loader(label: str, count: int = 6) -> str:
+    head = (
+        "<div class='chip chip--status'><div class='dot'></div>"
+        f"<div>{label}</div></div>"
+    )
+
+    cards_html = []
+    for _ in range(count):
+        cards_html.append(
+            "<div class='skel-card'>"
+            "  <div class='h'></div>"
+            "  <div class='line'></div>"
+            "  <div class='line'></div>"
+            "  <div class='line'></div>"
+            "</div>"
+        )
+    return head + "<div class='skel-cards'>" + "".join(cards_html) + "</div>"
+
+# Card markup templates (format strings parsed once, filled per type/state)
+CARD_TMPL = (
+    "<div class='card'>"
+    "  <h4>"
+    "    <a class='chip-link type-label' href='{type_href}' target='_blank'>{typ}:</a>"
+    "    <span class='chip chip--count'>{total}</span>"
+    "  </h4>"
+    "  <div class='muted'>{state_lines}</div>"
+    "</div>"
+)
+STATE_TMPL = '-) <a class="state-link" href="{url}" target="_blank">{s}: <span class="state-count">{n}</span></a>'
+
+# Show loader immediately in a stable placeholder
+sec1 = st.empty()
+with sec1.container():
+    st.markdown(render_cards_loader("Loading summary…"), unsafe_allow_html=True)
+
+def build_cards_html(type_map: dict) -> str:
+    cards = ['<div class="row">']
+    if not type_map:
+        cards.append('<div class="muted">No tasks found for the selected Project/Period.</div>')
+    else:
+        for typ, states in sorted(type_map.items(), key=lambda kv: (-sum(kv[1].values()), kv[0])):
+            make_url = yt_issues_url_builder(project, period_key, issue_type=typ)
+
+            # Per-state clickable lines
+            state_lines = "<br>".join(
+                STATE_TMPL.format_map({"url": make_url(state=s), "s": s, "n": n})
+                for s, n in sorted(states.items(), key=lambda kv: (-kv[1], kv[0]))
+            )
+
+            # Type label clickable (links to all tasks of that type for period)
+            cards.append(CARD_TMPL.format_map({
+                "type_href": make_url(),
+                "typ": typ,
+                "total": sum(states.values()),
+                "state_lines": state_lines,
+            }))
+    cards.append("</div>")
+    return "".join(cards)
+
+# Fetch while loader is visible (skipped when this session already rendered these filters)
+cards_html = cards_memo
+if cards_html is None:
+    cards_html = _session_put(
+        "_cards_html", (project, period_key),
+        build_cards_html(f_counts.result().get("per_project", {}).get(project, {}) or {}),
+    )
+
+# Replace loader with real cards
+sec1.empty()
+with sec1.container():
+    st.markdown(cards_html, unsafe_allow_html=True)
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+#______________________Section 1 ENDS_____________________________________________________________________
+
+
+
+
+#______________________Section 2 STARTS___________________________________________________________________
+st.markdown('<div class="mt-10"></div>', unsafe_allow_html=True)
+st.markdown('<h2 class="heading--section">Tasks Created Per Month in Current Year (by Type)</h2>', unsafe_allow_html=True)
+
+#loader
+def render_chart_loader(label: str) -> str:
+    head = (
+        "<div class='chip chip--status'><div class='dot'></div>"
+        f"<div>{label}</div></div>"
+    )
+
+    # 12 month placeholders (compact)
+    bars = "".join(f"<div class='skel-bar' title='{m}'></div>" for m in MONTH_ABBR[1:])
+    return head + "<div class='skel-chart'>" + bars + "</div>"
+
+@st.cache_resource
+def _monthly_chart_layout() -> go.Layout:
+    # Themed layout for the monthly chart; built once per process and merged into each figure
+    return apply_chart_theme(
+        go.Figure(),
+        height=320,
+        margin_t=50,
+        margin_b=0,
+        legend_orientation="v",
+        legend_x=1.02, legend_y=1, legend_xanchor="left", legend_yanchor="top",
+    ).layout
+
+sec2 = st.empty()
+with sec2.container():
+    st.markdown(render_chart_loader("Loading monthly counts…"), unsafe_allow_html=True)
+
+#Fetch while loader is visible
+monthly_data = f_monthly.result()
+
+# Transpose month -> {type: count} into one count vector per type; this single
+# pass also collects the set of types (empty when the year has no data)
+months = get_month_keys(year, current_month)
+month_labels = MONTH_ABBR[1:current_month + 1]
+month_idx = {m: i for i, m in enumerate(months)}
+mat: dict[str, np.ndarray] = {}
+for m, tdict in (monthly_data or {}).items():
+    i = month_idx.get(m)
+    if i is None:
+        continue
+    for t, v in tdict.items():
+        vec = mat.get(t)
+        if vec is None:
+            vec = mat[t] = np.zeros(len(months), dtype=np.int32)
+        vec[i] = v
+
+#Replace loader with final chart
+sec2.empty()
+with sec2.container():
+    if not mat:
+        st.markdown('<div class="muted">No data available for this year.</div>', unsafe_allow_html=True)
+    else:
+        all_types = sorted(mat)
+
+        # Bound the number of traces: keep the busiest types, merge the tail into "Other"
+        if len(all_types) > MAX_CHART_TYPES + 1:
+            totals = {t: int(mat[t].sum()) for t in all_types}
+            top = sorted(all_types, key=lambda t: (-totals[t], t))[:MAX_CHART_TYPES]
+            rest = [t for t in all_types if t not in top]
+            other = np.sum([mat.pop(t) for t in rest], axis=0, dtype=np.int32)
+            if "Other" in mat:
+                mat["Other"] = mat["Other"] + other
+                all_types = sorted(top)
+            else:
+                mat["Other"] = other
+                all_types = sorted(top) + ["Other"]
+
+        # Zero bars get no label: None serialises as null instead of an empty string
+        labels_mat = {t: np.where(mat[t] > 0, mat[t].astype(str), None).tolist() for t in all_types}
+
+        # Fixed colors for common types + rotating fallback palette
+        fallback_colors = cycle(FALLBACK_PALETTE)
+
+        fig = go.Figure()
+        for t in all_types:
+            color = TYPE_COLORS.get(t) or next(fallback_colors)
+            fig.add_bar(
+                name=t, x=month_labels, y=mat[t],
+                text=labels_mat[t], textposition="outside",
+                textfont=dict(color="#111", size=11), cliponaxis=False,
+                marker_color=color, hoverinfo="skip", hovertemplate=None
+            )
+
+        fig.update_layout(_monthly_chart_layout())
+        fig.update_layout(
+            barmode="group",
+            xaxis=dict(type="category", categoryorder="array", categoryarray=month_labels),
+            showlegend=True,
+        )
+
+        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+#______________________Section 2 ENDS_____________________________________________________________________
+
+
+
+# ______________________ Section 3 STARTS ______________________________________
+
+
+#loader (shared by Sections 3 and 4)
+def render_section_loader(label: str, cols: int) -> str:
+    head = (
+        "<div class='chip chip--status'><div class='dot'></div>"
+        f"<div>{label}</div></div>"
+    )
+
+    header = "<div class='skel-head'>Preparing table…</div>"
+    rows = []
+    for _ in range(6):  # 6 preview rows
+        cells = "".join("<div class='cell'></div>" for _ in range(cols))
+        rows.append(f"<div class='skel-row'>{cells}</div>")
+    return head + "<div class='skel'>" + header + "".join(rows) + "</div>"
+
+# KPI strip helpers (shared by Sections 3 and 4)
+def _pill(label, value):
+    return f"<div class='kpi__pill'><b>{label}:</b> {value}</div>"
+
+def ordered_types(type_counts: Counter) -> list[str]:
+    """Types in KPI_TYPE_ORDER first, then any others alphabetically."""
+    return [t for t in KPI_TYPE_ORDER if t in type_counts] + \
+           sorted(t for t in type_counts if t not in KPI_TYPE_ORDER)
+
+st.markdown('<div class="mt-10"></div>', unsafe_allow_html=True)
+st.markdown('<h2 class="heading--section">Deployments</h2>', unsafe_allow_html=True)
+st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+# Stable mount point + immediate custom loader
+class DeploymentRow(NamedTuple):
+    """One linked task in the deployments table (field order = column order)."""
+    deployment_id: str
+    task_id: str
+    title: str
+    type: str
+    state: str
+    created_on: str
+    deployed_on: str
+
+DEPLOYMENT_COLUMNS = ["Deployment ID", "Task ID", "Title", "Type", "State", "Created On", "Deployed On"]
+
+sec3 = st.empty()
+with sec3.container():
+    st.markdown(render_section_loader("Loading deployments…", cols=7), unsafe_allow_html=True)
+
+def flatten_and_sort(resp: dict) -> tuple[list[DeploymentRow], Counter, int, int]:
+    """
+    Flatten deployments -> linked tasks into table rows, sorted by deployed_on desc, then task_id.
+    Returns (rows_sorted, type_counts, total_tasks, deployments_count).
+    """
+    deployments = resp.get("deployments", []) or []
+    rows = [
+        DeploymentRow(
+            dep.get("deployment_id") or "",
+            li.get("id") or "",
+            li.get("title") or "",
+            (li.get("type") or "Unspecified").strip(),
+            li.get("state") or "",
+            li.get("created_on") or "",
+            dep.get("due_date") or "",
+        )
+        for dep in deployments for li in dep.get("linked", [])
+    ]
+    # Dates are YYYY-MM-DD, so the strings sort chronologically; anything
+    # malformed is demoted to the bottom.
+    rows.sort(key=lambda r: (r.deployed_on if len(r.deployed_on) == 10 else "", r.task_id), reverse=True)
+    return rows, Counter(r.type for r in rows), len(rows), len(deployments)
+
+#Run while loader is visible (flattened rows persist per (project, period) for the session)
+if deps_memo is None:
+    deps_memo = _session_put("_deps_rows", (project, period_key), flatten_and_sort(f_deps.result()))
+rows_sorted, type_counts, total_tasks, deployments_count = deps_memo
+
+#Replace loader with final UI
+sec3.empty()
+with sec3.container():
+    if not deployments_count:
+        # Nothing to count or render
+        st.markdown("<div class='muted'>No deployments found for this Project/Period.</div>", unsafe_allow_html=True)
+        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+    else:
+        # --- KPI strip (centered) ---
+        kpis = [
+            _pill("Total Deployments", deployments_count),
+            _pill("Deployed Tasks", total_tasks),
+        ] + [_pill(t, type_counts[t]) for t in ordered_types(type_counts)]
+
+        st.markdown("<div class='kpi'>" + "".join(kpis) + "</div>", unsafe_allow_html=True)
+        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+        # Render table: st.dataframe ships an Arrow buffer and only draws the visible rows
+        if rows_sorted:
+            df = pd.DataFrame(rows_sorted, columns=DEPLOYMENT_COLUMNS)
+            column_config = {}
+            if YT_BASE:
+                for col in ("Deployment ID", "Task ID"):
+                    df[col] = df[col].map(issue_link)
+                    # Show the issue key, link to the issue
+                    column_config[col] = st.column_config.LinkColumn(col, display_text=r"/issue/(.*)$")
+            st.dataframe(df, column_config=column_config, use_container_width=True, hide_index=True)
+        else:
+            st.markdown("<div class='muted'>No deployments found for this Project/Period.</div>", unsafe_allow_html=True)
+
+        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+# ______________________ Section 3 ENDS ______________________________________
+
+
+# ______________________ Section 4 STARTS ______________________________________
+
+st.markdown('<div class="mt-10"></div>', unsafe_allow_html=True)
+st.markdown('<h2 class="heading--section">Tasks in Business Review</h2>', unsafe_allow_html=True)
+st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+BR_ROW_TMPL = (
+    "<tr>"
+    "<td><a class='state-link' href='{href}' target='_blank'>{id}</a></td>"
+    "<td>{title}</td>"
+    "<td>{type}</td>"
+    "<td>{state}</td>"
+    "<td>{created_on}</td>"
+    "</tr>"
+)
+
+sec4 = st.empty()
+with sec4.container():
+    st.markdown(render_section_loader("Loading business review…", cols=5), unsafe_allow_html=True)
+
+# Fetch while loader is visible (no period filter here)
+br_resp = f_br.result()
+br_items = br_resp.get("items", []) or []
+
+# Replace loader with final UI
+sec4.empty()
+with sec4.container():
+    # KPIs (same structure/order as Section 3)
+    type_counts = Counter((it.get("type") or "Unspecified").strip() for it in br_items)
+    kpis = [
+        _pill("Total BR Tasks", len(br_items)),
+    ] + [_pill(t, type_counts[t]) for t in ordered_types(type_counts)]
+
+    st.markdown("<div class='kpi'>" + "".join(kpis) + "</div>", unsafe_allow_html=True)
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+    # Table (written straight into one buffer)
+    buf = StringIO()
+    buf.write(
+        "<div class='table-wrap'>"
+        "<table class='table table--compact'>"
+        "<thead><tr>"
+        "<th>Task ID</th><th>Title</th><th>Type</th><th>State</th><th>Created On</th>"
+        "</tr></thead>"
+        "<tbody>"
+    )
+
+    if not br_items:
+        buf.write("<tr><td colspan='5' class='muted'>No Business Review tasks found for this Project.</td></tr>")
+    else:
+        # Sort: newest first (by created_on, ISO strings sort chronologically), then Task ID
+        items_sorted = sorted(br_items, key=lambda r: (r.get('created_on') or "", r.get('id') or ""), reverse=True)
+
+        for it in items_sorted:
+            buf.write(BR_ROW_TMPL.format_map({
+                "href": issue_link(it.get("id")),
+                "id": it.get("id", ""),
+                "title": html.escape(it.get("title") or ""),
+                "type": html.escape(it.get("type", "")),
+                "state": html.escape(it.get("state", "")),
+                "created_on": it.get("created_on", ""),
+            }))
+
+    buf.write("</tbody></table></div>")
+    st.markdown(buf.getvalue(), unsafe_allow_html=True)
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+
+# ______________________ Section 4 ENDS ______________________________________
@@ -0,0 +1,88 @@
+# cache_utils.py
+"""
+Small in-process caching helpers shared by the YouTrack modules.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import typing as t
+from functools import wraps
+
+# Key for calls without arguments (skips building and sorting an args tuple)
+_NO_ARGS_KEY = ((), ())
+
+# Set on a background-refresh thread: nested ttl_cache functions it calls skip
+# their own (possibly just as stale) entries and store what they fetch instead.
+_refresh_state = threading.local()
+
+
+# --- Simple TTL cache decorator (default 30 minutes) ---
+def ttl_cache(ttl_seconds: int = 1800, *, stale_while_revalidate: bool = False):
+    """
+    Cache results per call arguments for `ttl_seconds`.
+    With stale_while_revalidate=True, an entry older than half the TTL is
+    still returned immediately while a daemon thread refreshes it, so
+    callers only block on a fetch when the entry is missing or fully expired.
+    The refresh bypasses any ttl_cache the function calls into, so it gets
+    fresh data rather than an inner layer's copy of the same stale result.
+    The cache is guarded by a lock, so it can be shared by worker threads.
+    """
+    def decorator(func):
+        _cache: dict[tuple, tuple[float, t.Any]] = {}
+        _refreshing: set[tuple] = set()
+        _lock = threading.Lock()
+
+        def _bg_refresh(key: tuple, args: tuple, kwargs: dict) -> None:
+            _refresh_state.active = True
+            try:
+                value = func(*args, **kwargs)
+                with _lock:
+                    _cache[key] = (time.time(), value)
+            except Exception:
+                pass  # keep serving the stale value; a call past the TTL retries in the foreground
+            finally:
+                _refresh_state.active = False
+                with _lock:
+                    _refreshing.discard(key)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not args and not kwargs:
+                key = _NO_ARGS_KEY
+            else:
+                key = (args, tuple(sorted(kwargs.items())))
+            now = time.time()
+            start_refresh = False
+            with _lock:
+                hit = None if getattr(_refresh_state, "active", False) else _cache.get(key)
+                if hit is not None:
+                    ts, value = hit
+                    age = now - ts
+                    if age < ttl_seconds:
+                        if stale_while_revalidate and age >= ttl_seconds / 2 and key not in _refreshing:
+                            _refreshing.add(key)
+                            start_refresh = True
+                    else:
+                        hit = None
+            if hit is not None:
+                if start_refresh:
+                    threading.Thread(
+                        target=_bg_refresh, args=(key, args, kwargs), daemon=True
+                    ).start()
+                return value
+            # Fetch outside the lock so slow calls for other keys are not serialized
+            value = func(*args, **kwargs)
+            with _lock:
+                _cache[key] = (now, value)
+            return value
+
+        def cache_clear() -> None:
+            with _lock:
+                _cache.clear()
+
+        # expose a way to clear cache
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return wrapper
+    return decorator
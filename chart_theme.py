@@ -1,4 +1,7 @@
 # chart_theme.py
+from functools import lru_cache
+from types import MappingProxyType
+
 import plotly.graph_objects as go
 
 # Default palette (edit/extend as you like)
@@ -7,51 +10,61 @@ DEFAULT_COLORWAY = [
     "#2c3e50", "#f39c12", "#16a085", "#d35400", "#7f8c8d"
 ]
 
-def apply_chart_theme(fig: go.Figure, **overrides) -> go.Figure:
-    base = {
-        "font_family": "Bahnschrift, 'Segoe UI', system-ui, -apple-system, Roboto, Arial, sans-serif",
-        "font_size": 12,
-        "title_size": 14,
-        "axis_title_size": 11,
-        "tick_size": 10,
-        "legend_size": 11,
-        "legend_orientation": "v",
-        "legend_x": 1.02,
-        "legend_y": 1,
-        "legend_xanchor": "left",
-        "legend_yanchor": "top",
-        "show_legend": True,
-        "height": 250,
-        "margin_l": 40, "margin_r": 40, "margin_t": 40, "margin_b": 40,
-        "plot_bg": "rgba(255,255,255,1)",
-        "paper_bg": "rgba(255,255,255,0)",
-        "xgrid": "rgba(0,0,0,0.06)",
-        "ygrid": "rgba(0,0,0,0.08)",
-        "zeroline": False,
-        "hover_bg": "rgba(0,0,0,0.85)",
-        "hover_font_color": "#fff",
-        "hover_font_size": 12,
-        "bargap": 0.18,
-        "bargroupgap": 0.06,
-
-        # NEW: colors + number labels
-        "colorway": DEFAULT_COLORWAY,   # list[str]
-        "show_bar_text": False,         # when True, put numbers above bars
-        "bar_text_color": "#111",
-        "bar_text_size": 11,
-
-        # Axis colors (titles + ticks)
-        "xaxis_title_color": "#111",
-        "xaxis_tick_color":  "#111",
-        "yaxis_title_color": "#111",
-        "yaxis_tick_color":  "#111",
-        # Optional axis line colors
-        "xaxis_line_color":  None,
-        "yaxis_line_color":  None,
-    }
-    base.update(overrides or {})
-
-    fig.update_layout(
+# Fixed colors for common task Types (others rotate through FALLBACK_PALETTE)
+TYPE_COLORS = {
+    "Bug": "#e74c3c",
+    "New Requirement": "#0748B1",
+    "Change Request": "#07B176",
+    "Other": "#bdc3c7",
+}
+FALLBACK_PALETTE = ["#146f91", "#075066", "#9b59b6", "#f39c12", "#34495e", "#1abc9c", "#f38942", "#7f8c8d"]
+
+# Theme defaults; apply_chart_theme(**overrides) replaces individual keys
+_THEME_DEFAULTS = MappingProxyType({
+    "font_family": "Bahnschrift, 'Segoe UI', system-ui, -apple-system, Roboto, Arial, sans-serif",
+    "font_size": 12,
+    "title_size": 14,
+    "axis_title_size": 11,
+    "tick_size": 10,
+    "legend_size": 11,
+    "legend_orientation": "v",
+    "legend_x": 1.02,
+    "legend_y": 1,
+    "legend_xanchor": "left",
+    "legend_yanchor": "top",
+    "show_legend": True,
+    "height": 250,
+    "margin_l": 40, "margin_r": 40, "margin_t": 40, "margin_b": 40,
+    "plot_bg": "rgba(255,255,255,1)",
+    "paper_bg": "rgba(255,255,255,0)",
+    "xgrid": "rgba(0,0,0,0.06)",
+    "ygrid": "rgba(0,0,0,0.08)",
+    "zeroline": False,
+    "hover_bg": "rgba(0,0,0,0.85)",
+    "hover_font_color": "#fff",
+    "hover_font_size": 12,
+    "bargap": 0.18,
+    "bargroupgap": 0.06,
+
+    # NEW: colors + number labels
+    "colorway": tuple(DEFAULT_COLORWAY),   # sequence of colors
+    "show_bar_text": False,         # when True, put numbers above bars
+    "bar_text_color": "#111",
+    "bar_text_size": 11,
+
+    # Axis colors (titles + ticks)
+    "xaxis_title_color": "#111",
+    "xaxis_tick_color":  "#111",
+    "yaxis_title_color": "#111",
+    "yaxis_tick_color":  "#111",
+    # Optional axis line colors
+    "xaxis_line_color":  None,
+    "yaxis_line_color":  None,
+})
+
+
+def _build_theme(base) -> tuple[go.Layout, go.layout.XAxis, go.layout.YAxis]:
+    layout = go.Layout(
         height=base["height"],
         margin=dict(l=base["margin_l"], r=base["margin_r"], t=base["margin_t"], b=base["margin_b"]),
         paper_bgcolor=base["paper_bg"],
@@ -70,11 +83,11 @@ def apply_chart_theme(fig: go.Figure, **overrides) -> go.Figure:
         bargap=base["bargap"],
         bargroupgap=base["bargroupgap"],
         showlegend=base["show_legend"],
-        colorway=base["colorway"],   # <- use your palette
+        colorway=list(base["colorway"]),   # <- use your palette
     )
 
     # Axes
-    fig.update_xaxes(
+    xaxis = go.layout.XAxis(
         title=dict(text="Month", font=dict(size=base["axis_title_size"], color=base["xaxis_title_color"])),
         tickfont=dict(size=base["tick_size"], color=base["xaxis_tick_color"]),
         showgrid=True, gridcolor=base["xgrid"],
@@ -82,7 +95,7 @@ def apply_chart_theme(fig: go.Figure, **overrides) -> go.Figure:
         showline=bool(base["xaxis_line_color"]),
         linecolor=base["xaxis_line_color"] or "rgba(0,0,0,0)"
     )
-    fig.update_yaxes(
+    yaxis = go.layout.YAxis(
         title=dict(text="Task Count", font=dict(size=base["axis_title_size"], color=base["yaxis_title_color"])),
         tickfont=dict(size=base["tick_size"], color=base["yaxis_tick_color"]),
         showgrid=True, gridcolor=base["ygrid"],
@@ -90,6 +103,26 @@ def apply_chart_theme(fig: go.Figure, **overrides) -> go.Figure:
         showline=bool(base["yaxis_line_color"]),
         linecolor=base["yaxis_line_color"] or "rgba(0,0,0,0)"
     )
+    return layout, xaxis, yaxis
+
+
+@lru_cache(maxsize=32)
+def _cached_theme(override_items: tuple) -> tuple[go.Layout, go.layout.XAxis, go.layout.YAxis]:
+    """Validated layout objects per distinct set of overrides, built once."""
+    return _build_theme({**_THEME_DEFAULTS, **dict(override_items)})
+
+
+def apply_chart_theme(fig: go.Figure, **overrides) -> go.Figure:
+    base = {**_THEME_DEFAULTS, **overrides}
+    try:
+        layout, xaxis, yaxis = _cached_theme(tuple(sorted(overrides.items())))
+    except TypeError:
+        # Unhashable override (e.g. a colorway list): build this one uncached
+        layout, xaxis, yaxis = _build_theme(base)
+
+    fig.update_layout(layout)
+    fig.update_xaxes(xaxis)
+    fig.update_yaxes(yaxis)
 
     # If labels are requested, set text styling globally
     if base["show_bar_text"]:
@@ -24,7 +24,24 @@ PERIOD_LABELS = {
 }
 
 
+# Time zone YouTrack reads query dates in (the token user's profile setting),
+# e.g. "Asia/Riyadh". None = ask YouTrack for the profile's zone (UTC if that fails).
+YOUTRACK_TIMEZONE = None
+
+
 # Task Types to exclude
 EXCLUDED_TYPES = [
     "Deployment"
-]
\ No newline at end of file
+]
+
+
+# Monthly chart: max Types drawn as their own bars (the rest are merged into "Other")
+MAX_CHART_TYPES = 6
+
+
+# Preferred Type order in the KPI strips (other Types follow alphabetically)
+KPI_TYPE_ORDER = (
+    "Bug", "Change Request", "New Requirement", "Enhancement",
+    "System Understanding", "Tech Task", "Exceptional Cases",
+    "External Dependency", "End User Mistake",
+)
@@ -0,0 +1,67 @@
+# http_client.py
+"""
+Shared HTTP session for the YouTrack modules.
+youtrack_queries and youtrack_metadata both import SESSION from here, so the
+dashboard's worker threads draw on one connection pool (one TLS handshake per
+pooled connection, not per module) with one retry policy and one set of headers.
+"""
+
+from __future__ import annotations
+
+import os
+import requests
+
+# --- JSON decoding: orjson when installed (parses response bytes directly), else stdlib ---
+try:
+    from orjson import loads  # type: ignore
+except ImportError:
+    from json import loads
+
+# --- Optional: load .env (no-op if python-dotenv isn't installed) ---
+try:
+    from dotenv import load_dotenv  # type: ignore
+    load_dotenv()
+except Exception:
+    pass
+
+# --- Config from environment ---
+YOUTRACK_URL: str = os.getenv("YOUTRACK_URL", "").rstrip("/")
+YOUTRACK_TOKEN: str = os.getenv("YOUTRACK_TOKEN", "")
+
+if not YOUTRACK_URL or not YOUTRACK_TOKEN:
+    raise RuntimeError("YOUTRACK_URL or YOUTRACK_TOKEN not found in environment (.env).")
+
+# Enough pooled connections for everything that can be in flight at once
+# (the dashboard's section workers, page prefetch, concurrent link resolves)
+# instead of queueing on urllib3's default pool of 10.
+POOL_SIZE = 32
+TIMEOUT = 20  # seconds
+
+# --- Requests session with retries/timeouts ---
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    # Retry on transient errors
+    try:
+        from urllib3.util import Retry  # type: ignore
+        from requests.adapters import HTTPAdapter
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"])
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retries
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    except Exception:
+        # If urllib3 Retry not available, continue without it.
+        pass
+    session.headers.update({
+        "Authorization": f"Bearer {YOUTRACK_TOKEN}",
+        "Accept": "application/json",
+    })
+    return session
+
+SESSION = _make_session()
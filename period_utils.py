@@ -5,25 +5,59 @@ and to build YouTrack query fragments for date fields.
 """
 
 from __future__ import annotations
-from datetime import date, timedelta
+import calendar
+from calendar import monthrange
+from datetime import date
+from functools import lru_cache
 from config import PERIOD_KEYS
 
 
+# Month abbreviations, resolved once at import: ["", "Jan", ..., "Dec"]
+MONTH_ABBR: list[str] = list(calendar.month_abbr)
+
+
 # Internal helpers
 
 def _first_day_of_month(d: date) -> date:
     return d.replace(day=1)
 
+@lru_cache(maxsize=64)
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, monthrange(year, month)[1])
+
 def _last_day_of_month(d: date) -> date:
-    if d.month == 12:
-        nxt = d.replace(year=d.year + 1, month=1, day=1)
-    else:
-        nxt = d.replace(month=d.month + 1, day=1)
-    return nxt - timedelta(days=1)
+    return _month_end(d.year, d.month)
+
+
+def _shift_months(d: date, months: int) -> date:
+    """First day of the month `months` away from d's month (negative = back)."""
+    y, m = divmod(d.year * 12 + d.month - 1 + months, 12)
+    return date(y, m + 1, 1)
 
 
 # Main period resolver (single function to maintain)
 
+_RESOLVERS = {
+    "current_month": lambda d: (
+        _first_day_of_month(d),
+        _last_day_of_month(d),
+    ),
+    "previous_month": lambda d: (
+        _shift_months(d, -1),
+        _last_day_of_month(_shift_months(d, -1)),
+    ),
+    "last_6_months": lambda d: (
+        # first day of month, 5 months ago
+        _shift_months(d, -5),
+        _last_day_of_month(d),
+    ),
+    "last_1_year": lambda d: (
+        # same month last year, first day
+        _shift_months(d, -12),
+        _last_day_of_month(d),
+    ),
+}
+
 def get_period_range(period_key: str, today: date | None = None) -> tuple[date, date]:
     """
     Given a period key (e.g. 'current_month'), return (start_date, end_date) inclusive.
@@ -31,40 +65,15 @@ def get_period_range(period_key: str, today: date | None = None) -> tuple[date,
     """
     if today is None:
         today = date.today()
+    return _resolve_period(period_key, today)
 
-    resolvers = {
-        "current_month": lambda d: (
-            _first_day_of_month(d),
-            _last_day_of_month(d),
-        ),
-        "previous_month": lambda d: (
-            _first_day_of_month((_first_day_of_month(d) - timedelta(days=1))),
-            _last_day_of_month((_first_day_of_month(d) - timedelta(days=1))),
-        ),
-        "last_6_months": lambda d: (
-            # first day of month, 5 months ago
-            _first_day_of_month(
-                date(
-                    d.year - ((d.month - 5) <= 0),
-                    ((d.month - 5 - 1) % 12) + 1,
-                    1,
-                )
-            ),
-            _last_day_of_month(d),
-        ),
-        "last_1_year": lambda d: (
-            # same month last year, first day
-            date(d.year - 1, d.month, 1),
-            _last_day_of_month(d),
-        ),
-    }
-
-    if period_key not in resolvers:
+@lru_cache(maxsize=32)
+def _resolve_period(period_key: str, today: date) -> tuple[date, date]:
+    if period_key not in _RESOLVERS:
         raise ValueError(
             f"Unknown period key: {period_key!r}. Expected one of {PERIOD_KEYS}"
         )
-
-    return resolvers[period_key](today)
+    return _RESOLVERS[period_key](today)
 
 
 # Generic YouTrack query helpers (avoid repeating formatting)
@@ -77,6 +86,15 @@ def get_field_period_filter(field: str, period_key: str) -> str:
         → 'created: {2025-08-01} .. {2025-08-31}'
     """
     start, end = get_period_range(period_key)
+    return get_field_range_filter(field, start, end)
+
+def get_field_range_filter(field: str, start: date, end: date) -> str:
+    """
+    Same fragment for an already-resolved (start, end) range.
+    Example:
+        get_field_range_filter("created", date(2025, 8, 1), date(2025, 8, 31))
+        → 'created: {2025-08-01} .. {2025-08-31}'
+    """
     return f"{field}: {{{start.isoformat()}}} .. {{{end.isoformat()}}}"
 
 def get_created_filter(period_key: str) -> str:
@@ -89,6 +107,16 @@ def get_created_filter(period_key: str) -> str:
     return get_field_period_filter("created", period_key)
 
 
+@lru_cache(maxsize=16)
+def get_month_keys(year: int, last_month: int) -> tuple[str, ...]:
+    """
+    Month keys for Jan..last_month of the given year.
+    Example:
+        get_month_keys(2025, 3) → ('2025-01', '2025-02', '2025-03')
+    """
+    return tuple(f"{year}-{m:02d}" for m in range(1, last_month + 1))
+
+
 # Self-test (optional)
 
 if __name__ == "__main__":
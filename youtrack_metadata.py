@@ -1,82 +1,20 @@
 from __future__ import annotations
 
-import os
-import time
 import typing as t
-import requests
-from functools import wraps
 from urllib.parse import urljoin
 
-# --- Optional: load .env (no-op if python-dotenv isn't installed) ---
-try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv()
-except Exception:
-    pass
-
-# --- Config from environment ---
-YOUTRACK_URL: str = os.getenv("YOUTRACK_URL", "").rstrip("/")
-YOUTRACK_TOKEN: str = os.getenv("YOUTRACK_TOKEN", "")
-
-if not YOUTRACK_URL or not YOUTRACK_TOKEN:
-    raise RuntimeError("YOUTRACK_URL or YOUTRACK_TOKEN not found in environment (.env).")
-
-# --- Simple TTL cache decorator (default 30 minutes) ---
-def ttl_cache(ttl_seconds: int = 1800):
-    def decorator(func):
-        _cache: dict[tuple, tuple[float, t.Any]] = {}
-
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            key = (args, tuple(sorted(kwargs.items())))
-            now = time.time()
-            if key in _cache:
-                ts, value = _cache[key]
-                if now - ts < ttl_seconds:
-                    return value
-            value = func(*args, **kwargs)
-            _cache[key] = (now, value)
-            return value
-
-        # expose a way to clear cache
-        wrapper.cache_clear = _cache.clear  # type: ignore[attr-defined]
-        return wrapper
-    return decorator
-
-# --- Requests session with retries/timeouts ---
-def _make_session() -> requests.Session:
-    session = requests.Session()
-    # Retry on transient errors
-    try:
-        from urllib3.util import Retry  # type: ignore
-        from requests.adapters import HTTPAdapter
-        retries = Retry(
-            total=3,
-            backoff_factor=0.5,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=frozenset(["GET"])
-        )
-        adapter = HTTPAdapter(max_retries=retries)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-    except Exception:
-        # If urllib3 Retry not available, continue without it.
-        pass
-    session.headers.update({
-        "Authorization": f"Bearer {YOUTRACK_TOKEN}",
-        "Accept": "application/json"
-    })
-    return session
+from cache_utils import ttl_cache
+from http_client import SESSION, TIMEOUT, YOUTRACK_URL, loads as _loads
 
-_SESSION = _make_session()
-_DEFAULT_TIMEOUT = 20  # seconds
+_SESSION = SESSION
+_DEFAULT_TIMEOUT = TIMEOUT
 
 # --- Helpers ---
 def _get(url_path: str, params: dict | None = None) -> t.Any:
     url = urljoin(YOUTRACK_URL + "/", url_path.lstrip("/"))
     resp = _SESSION.get(url, params=params, timeout=_DEFAULT_TIMEOUT)
     resp.raise_for_status()
-    return resp.json()
+    return _loads(resp.content)
 
 def _find_bundle_id_for_field(project_id: str, field_name: str) -> str | None:
     """
@@ -141,9 +79,7 @@ def fetch_projects() -> dict[str, list[str]]:
             tokens = [tok for tok in n.replace("argaam", "").split() if tok]
             synonyms.extend(tokens)
         # Deduplicate while preserving order
-        seen = set()
-        uniq = [s for s in synonyms if not (s in seen or seen.add(s))]
-        project_map[short] = uniq
+        project_map[short] = list(dict.fromkeys(synonyms))
 
     return project_map
 
@@ -206,11 +142,24 @@ def fetch_assignees(max_users: int = 5000) -> dict[str, str]:
 
     return mapping
 
+@ttl_cache(1800)
+def fetch_user_timezone() -> str | None:
+    """
+    Returns the time zone id (e.g. "Europe/Berlin") of the token user's
+    profile, which YouTrack uses to read dates in queries; None if unavailable.
+    """
+    try:
+        data = _get("/api/users/me/profiles/general", {"fields": "timezone(id)"})
+    except Exception:
+        return None  # cached like a result, so a missing permission isn't retried every call
+    return ((data or {}).get("timezone") or {}).get("id") or None
+
 # --- Convenience: quick sanity probe (optional) ---
 if __name__ == "__main__":
     # Quick self-test (safe GETs)
     print("Projects:", list(fetch_projects().keys())[:10])
     print("Types (APLUS):", fetch_task_types("APLUS"))
     print("States (APLUS):", fetch_task_states("APLUS"))
+    print("Time zone:", fetch_user_timezone())
     assignees = fetch_assignees()
     print("Assignees sample:", list(assignees.items())[:10])
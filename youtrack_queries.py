@@ -1,131 +1,356 @@
 # youtrack_queries.py
 from __future__ import annotations
 import os
-from typing import Dict, List, Any
-import requests
-import os
-from urllib.parse import quote
-from period_utils import get_created_filter
-from period_utils import get_period_range
+import re
+import threading
+import time
+from bisect import bisect_right
+from calendar import monthrange
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any
 from urllib.parse import quote
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+import requests
+
+from cache_utils import ttl_cache
+from http_client import SESSION, TIMEOUT, YOUTRACK_URL, YOUTRACK_TOKEN, loads as _loads
+from youtrack_metadata import fetch_task_types, fetch_user_timezone
+from period_utils import (
+    get_period_range, get_field_period_filter, get_field_range_filter, get_month_keys,
+)
 
-# Optional .env loader (safe no-op if not installed)
-try:
-    from dotenv import load_dotenv  # type: ignore
-    load_dotenv()
-except Exception:
-    pass
 
 # Read from config safely (EXCLUDED_TYPES might not exist yet)
 import config
 ACTIVE_PROJECTS = [p.strip().upper() for p in getattr(config, "ACTIVE_PROJECTS", []) if p.strip()]
-EXCLUDED_TYPES = {t.strip().lower() for t in getattr(config, "EXCLUDED_TYPES", []) if isinstance(t, str) and t.strip()}
-
-from period_utils import get_created_filter
+_ACTIVE = frozenset(ACTIVE_PROJECTS)
+# Original case is kept: the names go straight into YouTrack queries (matched case-insensitively there)
+EXCLUDED_TYPES = tuple(t.strip() for t in getattr(config, "EXCLUDED_TYPES", []) if isinstance(t, str) and t.strip())
+YOUTRACK_TIMEZONE = getattr(config, "YOUTRACK_TIMEZONE", None)
+
+# ---- HTTP session (shared with youtrack_metadata, see http_client.py) ----
+_SESSION = SESSION
+_TIMEOUT = TIMEOUT
+_BASE = YOUTRACK_URL + "/"  # YOUTRACK_URL is already stripped of its trailing slash
+
+# Conditional GETs: (url, params) -> (ETag, Last-Modified, decoded body).
+# Repeat requests send the validators back; a 304 reuses the stored body
+# instead of downloading and decoding the page again.
+_VALIDATORS: Dict[tuple, tuple] = {}
+_VALIDATORS_MAX = 128
+_VALIDATORS_LOCK = threading.Lock()
+
+def _validator_key(url: str, params: Dict[str, Any] | None) -> tuple:
+    items = ((k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items())
+    return (url, tuple(sorted(items)))
 
-YOUTRACK_URL: str = os.getenv("YOUTRACK_URL", "").rstrip("/")
-YOUTRACK_TOKEN: str = os.getenv("YOUTRACK_TOKEN", "")
+def _get(path: str, params: Dict[str, Any] | None = None) -> Any:
+    url = _BASE + path.lstrip("/")
+    key = _validator_key(url, params)
+    with _VALIDATORS_LOCK:
+        cached = _VALIDATORS.get(key)
+
+    headers = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    r = _SESSION.get(url, params=params, headers=headers or None, timeout=_TIMEOUT)
+    if r.status_code == 304 and cached:
+        return cached[2]
+    r.raise_for_status()
+    data = _loads(r.content)
 
-if not YOUTRACK_URL or not YOUTRACK_TOKEN:
-    raise RuntimeError("YOUTRACK_URL or YOUTRACK_TOKEN not found in environment (.env).")
+    etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+    if etag or last_modified:
+        with _VALIDATORS_LOCK:
+            _VALIDATORS.pop(key, None)
+            _VALIDATORS[key] = (etag, last_modified, data)
+            while len(_VALIDATORS) > _VALIDATORS_MAX:
+                del _VALIDATORS[next(iter(_VALIDATORS))]  # oldest first
+    return data
 
-# ---- HTTP session ----
-_SESSION = requests.Session()
-_SESSION.headers.update({
-    "Authorization": f"Bearer {YOUTRACK_TOKEN}",
-    "Accept": "application/json",
-})
-_TIMEOUT = 20  # seconds
+# YouTrack answers count = -1 while it is still counting; poll a few times
+_COUNT_ATTEMPTS = 5
 
-def _get(path: str, params: Dict[str, Any] | None = None) -> Any:
-    url = f"{YOUTRACK_URL.rstrip('/')}/{path.lstrip('/')}"
-    r = _SESSION.get(url, params=params, timeout=_TIMEOUT)
-    r.raise_for_status()
-    return r.json()
+def _count_issues(yt_query: str) -> int | None:
+    """
+    Number of issues matching the query, via POST /api/issuesGetter/count
+    (a single integer instead of every issue's payload).
+    Returns None on any HTTP/decoding error or if the count never settles,
+    so callers can fall back to streaming the issues.
+    """
+    url = _BASE + "api/issuesGetter/count"
+    for attempt in range(_COUNT_ATTEMPTS):
+        try:
+            r = _SESSION.post(url, params={"fields": "count"}, json={"query": yt_query}, timeout=_TIMEOUT)
+            if r.status_code != 200:
+                return None
+            count = (_loads(r.content) or {}).get("count")
+        except (requests.RequestException, ValueError, AttributeError):
+            return None
+        if isinstance(count, int) and count >= 0:
+            return count
+        time.sleep(0.2 * (attempt + 1))
+    return None
 
 # ---- Core issue fetcher (paged) ----
-def _iter_issues_minimal(yt_query: str, page_size: int = 100):
+# Custom fields the aggregations read (Type under any of its names, State).
+# Passed as repeated `customFields=` params so YouTrack omits every other field.
+# Type/State values always carry `name`, so `localizedName` isn't requested here.
+_MINIMAL_CUSTOM_FIELDS = ("Type", "Issue Type", "State")
+_MINIMAL_FIELDS = (
+    "idReadable,"
+    "project(shortName),"
+    "created,"
+    "customFields(name,value(name))"
+)
+
+# Issues per request; each page is one round-trip, so bigger pages mean fewer of them.
+# Override with YT_PAGE_SIZE if the server rejects large pages.
+try:
+    _PAGE_SIZE = max(1, int(os.getenv("YT_PAGE_SIZE", "500")))
+except ValueError:
+    _PAGE_SIZE = 500
+_MIN_PAGE_SIZE = 50
+
+def _page_too_large(exc: Exception) -> bool:
+    """413 or a read timeout: the page was too big for the server to answer in time."""
+    if isinstance(exc, requests.Timeout):
+        return True
+    resp = getattr(exc, "response", None)
+    return isinstance(exc, requests.HTTPError) and resp is not None and resp.status_code == 413
+
+# Cursor paging: pages come sorted by created and each next request narrows
+# the created range to where the last page ended, instead of a growing $skip
+# the server has to scan past. Only for queries with no created filter or a
+# single `created: {a} .. {b}` range; repeating `created:` would be OR-ed.
+_CURSOR_SORT = "sort by: created asc"
+_CREATED_RANGE_RE = re.compile(r"created: \{(\d{4}-\d{2}-\d{2})\} \.\. \{(\d{4}-\d{2}-\d{2})\}")
+_DAY_MS = 86_400_000
+# Switched off for the process once a cursor query gets a 400 and the same
+# query without the cursor then succeeds (the server doesn't take the cursor)
+_CURSOR_PAGING = True
+
+def _cursor_query_builder(yt_query: str):
+    """
+    Return `make_query(since=None)` -> yt_query sorted by created, with the
+    created range starting at `since` ('YYYY-MM-DD') when given; or None when
+    the query can't take a cursor (own sort, or any other created filter).
+    """
+    lowered = yt_query.lower()
+    if not _CURSOR_PAGING or "sort by" in lowered:
+        return None
+    if "created" not in lowered:
+        def make_query(since: str | None = None) -> str:
+            if since is None:
+                return f"{yt_query} {_CURSOR_SORT}".strip()
+            return f"{yt_query} created: {{{since}}} .. * {_CURSOR_SORT}".strip()
+        return make_query
+
+    m = _CREATED_RANGE_RE.search(yt_query)
+    if m is None or lowered.count("created") != 1:
+        return None
+    head, tail = yt_query[:m.start()], yt_query[m.end():]
+    start, end = m.group(1), m.group(2)
+    def make_query(since: str | None = None) -> str:
+        lo = since if since is not None and since > start else start
+        return f"{head}created: {{{lo}}} .. {{{end}}}{tail} {_CURSOR_SORT}".strip()
+    return make_query
+
+def _iter_issue_pages(params: Dict[str, Any], page_size: int, *, prefetch: bool = False):
+    """
+    Iterate through /api/issues for params["query"], page by page.
+    With a cursor, the next page's range starts one day before the last issue's
+    UTC date (query dates are in the user's time zone); issues repeated in that
+    overlap are dropped by idReadable. Once a page brings back fewer than half
+    new issues (a dense stretch, where re-reading a day costs more round-trips
+    than the cursor saves), the cursor stops and $skip continues within the
+    current cursor query, which still covers everything not yet seen.
+    Without a cursor it is plain $skip paging. A 400 on a cursor query retries
+    the plain query from the start; only if that works is cursor paging turned
+    off for later calls, otherwise the error is raised as usual.
+    A page that fails with 413/timeout is retried at half the size.
+    With `prefetch`, after a full page arrives the next one is requested in
+    the background while the caller consumes the current one.
+    """
+    global _CURSOR_PAGING
+    base_query = params["query"]
+    make_query = _cursor_query_builder(base_query)
+    seen: set | None = set() if make_query is not None else None
+    query = make_query() if make_query is not None else base_query
+    cursor_rejected = False
+    since = ""  # cursor position ('YYYY-MM-DD'); only ever moves forward
+    skip = 0
+    executor: ThreadPoolExecutor | None = None  # created once a second page is needed
+    pending = None  # in-flight request for the page at (query, skip)
+    try:
+        while True:
+            try:
+                if pending is not None:
+                    batch = pending.result()
+                else:
+                    params["query"], params["$top"], params["$skip"] = query, page_size, skip
+                    batch = _get("/api/issues", params=params)
+            except (requests.HTTPError, requests.Timeout) as exc:
+                pending = None
+                resp = getattr(exc, "response", None)
+                if query != base_query and resp is not None and resp.status_code == 400:
+                    # Maybe the cursor: restart on plain $skip; `seen` drops what was already yielded
+                    cursor_rejected = True
+                    make_query, query, since, skip = None, base_query, "", 0
+                    continue
+                if page_size <= _MIN_PAGE_SIZE or not _page_too_large(exc):
+                    raise
+                page_size = max(_MIN_PAGE_SIZE, page_size // 2)
+                continue
+            pending = None
+            if cursor_rejected:
+                # The plain query works, so it was the cursor the server refused
+                _CURSOR_PAGING = False
+                cursor_rejected = False
+            if not batch:
+                break
+            if seen is None:
+                fresh = batch
+            else:
+                fresh = []
+                for item in batch:
+                    key = item.get("idReadable")
+                    if key is not None:
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    fresh.append(item)
+            full = len(batch) >= page_size
+            if full:
+                if make_query is not None and 2 * len(fresh) < len(batch):
+                    make_query = None  # mostly overlap: stay on this query from here on
+                # Next position: move the cursor if it advanced, otherwise skip within this query
+                next_query = query
+                if make_query is not None:
+                    last_ms = batch[-1].get("created")
+                    if isinstance(last_ms, (int, float)) and last_ms > 0:
+                        since = max(since, _ms_to_iso_date(last_ms - _DAY_MS))
+                        next_query = make_query(since)
+                if next_query != query:
+                    query, skip = next_query, 0
+                else:
+                    skip += len(batch)
+                if prefetch:
+                    # params is not touched again until this request has completed
+                    if executor is None:
+                        executor = ThreadPoolExecutor(max_workers=1)
+                    params["query"], params["$top"], params["$skip"] = query, page_size, skip
+                    pending = executor.submit(_get, "/api/issues", params=params)
+            yield from fresh
+            if not full:
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+def _iter_issues_minimal(yt_query: str, page_size: int = _PAGE_SIZE):
     """
     Iterate through issues matching query.
-    We request only fields needed for "by type" aggregation.
+    We request only fields needed for "by type" aggregation, and only the
+    Type/State custom fields (not all of them) via the `customFields` param.
     (Subtasks are already excluded in the query via `has: -{subtask of}`.)
+    Paging, backoff and one page of prefetch: see _iter_issue_pages.
     """
-    fields = (
-        "idReadable,"
-        "project(shortName),"
-        "created,"
-        "customFields(name,value(name,localizedName))"
-    )
-    skip = 0
-    while True:
-        params = {
-            "query": yt_query,
-            "fields": fields,
-            "$top": page_size,
-            "$skip": skip,
-        }
-        batch = _get("/api/issues", params=params)
-        if not batch:
-            break
-        for item in batch:
-            yield item
-        if len(batch) < page_size:
-            break
-        skip += page_size
+    params = {
+        "query": yt_query,
+        "fields": _MINIMAL_FIELDS,
+        "customFields": list(_MINIMAL_CUSTOM_FIELDS),
+    }
+    return _iter_issue_pages(params, page_size, prefetch=True)
 
 # ---- Helpers ----
+def _query_timezone():
+    """
+    Zone YouTrack reads query dates in: config.YOUTRACK_TIMEZONE, else the
+    token user's profile zone, else UTC.
+    """
+    name = YOUTRACK_TIMEZONE or fetch_user_timezone()
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return timezone.utc
 
+def _ms_to_iso_date(ms: int | float) -> str:
+    """Epoch milliseconds -> 'YYYY-MM-DD' (UTC) without building datetime/date objects."""
+    g = time.gmtime(int(ms) // 1000)
+    return "%04d-%02d-%02d" % (g.tm_year, g.tm_mon, g.tm_mday)
 
-# youtrack_queries.py
-
-from datetime import date
-from calendar import monthrange
 
 def get_monthly_task_counts_by_type(project: str, year: int) -> Dict[str, Dict[str, int]]:
     """
     Returns mapping: "YYYY-MM" -> { type -> count } for the given project and year.
     Months included: Jan..current month (dynamic), missing months => {} (handled as 0 in UI).
-    Respects EXCLUDED_TYPES (case-insensitive) and excludes subtasks.
+    Excludes EXCLUDED_TYPES and subtasks in the query itself.
     """
     if not project or not YOUTRACK_URL or not YOUTRACK_TOKEN:
         return {}
+    today = date.today()
+    return _monthly_task_counts(project, year, today.month if year == today.year else 12)
 
-    # Build month keys in order (Jan..current month)
-    current_month = date.today().month if year == date.today().year else 12
-    month_keys = [f"{year}-{m:02d}" for m in range(1, current_month + 1)]
 
-    out: Dict[str, Dict[str, int]] = {}
+# Keyed on the last month too, so a month rollover starts a new entry
+@ttl_cache(300, stale_while_revalidate=True)
+def _monthly_task_counts(project: str, year: int, current_month: int) -> Dict[str, Dict[str, int]]:
+    # Build month keys in order (Jan..current month)
+    month_keys = get_month_keys(year, current_month)
 
-    for m in range(1, current_month + 1):
-        start = date(year, m, 1)
-        end = date(year, m, monthrange(year, m)[1])  # last day of month
+    # One query for Jan 1 .. end of the last month, bucketed by created month below
+    start = date(year, 1, 1)
+    end = date(year, current_month, monthrange(year, current_month)[1])  # last day of month
 
-        created_clause = f"created: {{{start.isoformat()}}} .. {{{end.isoformat()}}}"
-        proj_clause = f"project: {{{project}}}"
-        no_subtasks_clause = "has: -{subtask of}"
+    created_clause = get_field_range_filter("created", start, end)
+    proj_clause = f"project: {{{project}}}"
+    no_subtasks_clause = "has: -{subtask of}"
+    excluded_clause = _EXCLUDED_TYPES_CLAUSE
 
-        yt_query = f"{proj_clause} {created_clause} {no_subtasks_clause}".strip()
+    yt_query = f"{proj_clause} {created_clause} {no_subtasks_clause} {excluded_clause}".strip()
 
-        month_key = f"{year}-{m:02d}"
-        per_type: Dict[str, int] = {}
+    # Month starts (epoch ms) in the zone the query's dates are read in, so an
+    # issue lands in the same month the server counted it for. Issues before the
+    # first start (zone mismatch) go to January rather than being dropped.
+    tz = _query_timezone()
+    month_starts = [int(datetime(year, m, 1, tzinfo=tz).timestamp() * 1000) for m in range(1, current_month + 1)]
 
-        for issue in _iter_issues_minimal(yt_query):
-            itype = _extract_type_from_issue(issue) or "Unspecified"
-            if itype.strip().lower() in EXCLUDED_TYPES:
-                continue
-            per_type[itype] = per_type.get(itype, 0) + 1
+    # One (month index, type) tuple per issue, counted in a single Counter pass below
+    rows: List[tuple] = []
 
-        out[month_key] = per_type
+    for issue in _iter_issues_minimal(yt_query):
+        created_ms = issue.get("created")
+        if not isinstance(created_ms, (int, float)) or created_ms <= 0:
+            continue
+        month_idx = max(bisect_right(month_starts, created_ms) - 1, 0)
+        rows.append((month_idx, _extract_type_from_issue(issue) or "Unspecified"))
 
-    # Ensure stable order (optional – dict keeps insertion order in Py3.7+)
-    return {k: out.get(k, {}) for k in month_keys}
+    # Pre-seeded in month order
+    out: Dict[str, Dict[str, int]] = {k: {} for k in month_keys}
+    for (month_idx, itype), n in Counter(rows).items():
+        out[month_keys[month_idx]][itype] = n
+    return out
 
 
 def _qt(val: str) -> str:
     """Quote UI query values only if they contain spaces."""
     val = (val or "").strip()
-    return f'"{val}"' if val and any(c.isspace() for c in val) else val
+    if not val:
+        return val
+    # Already stripped, so split() yields more than one part iff there is inner whitespace
+    return f'"{val}"' if len(val.split()) > 1 else val
 
 
 
@@ -137,52 +362,145 @@ def yt_issues_url(project: str, period_key: str,
     Example:
       /issues?q=Project:{Argaam Plus} created:2025-08-01 .. 2025-08-31 type:{New Requirement} has:-{Subtask of}
     """
-    base = os.getenv("YOUTRACK_URL", "").rstrip("/")
-    if not base:
-        return "#"
+    return yt_issues_url_builder(project, period_key, issue_type=issue_type)(state=state)
 
-    start, end = get_period_range(period_key)
 
-    parts = [
+@lru_cache(maxsize=64)
+def _issues_query_prefix(project: str, period_key: str, today: date) -> str:
+    """Shared project/period part of the /issues query (today keeps it fresh across month ends)."""
+    start, end = get_period_range(period_key, today)
+    return " ".join([
         f"Project:{{{project}}}",
         f"created:{start.isoformat()} .. {end.isoformat()}",
         "has:-{Subtask of}",
-    ]
+    ])
+
+
+def yt_issues_url_builder(project: str, period_key: str,
+                          issue_type: str | None = None):
+    """
+    Return a callable `make_url(state=None)` for one project/period/type.
+    The shared part of the URL is encoded once; only the State suffix is
+    added per call, e.g.:
+      make_url = yt_issues_url_builder("APLUS", "current_month", issue_type="Bug")
+      make_url()             -> all Bugs in the period
+      make_url(state="Open") -> open Bugs in the period
+    """
+    base = os.getenv("YOUTRACK_URL", "").rstrip("/")
+    if not base:
+        return lambda state=None: "#"
+
+    query = _issues_query_prefix(project, period_key, date.today())
     if issue_type:
-        parts.append(f"Type:{{{issue_type}}}")
-    if state:
-        parts.append(f"State:{{{state}}}")
+        query += f" Type:{{{issue_type}}}"
+    prefix = f"{base}/issues?q={quote(query)}"
 
-    query = " ".join(parts)
-    return f"{base}/issues?q={quote(query)}"
+    def make_url(state: str | None = None) -> str:
+        if not state:
+            return prefix
+        # quote() works per character, so encoding the suffix separately is equivalent
+        return prefix + quote(f" State:{{{state}}}")
 
+    return make_url
 
 
 
 
+
+# Custom field names that carry the issue Type (lower-cased)
+_TYPE_FIELD_NAMES = frozenset({"type", "issue type", "issuetype"})
+
+def _cf_value_name(val: Any) -> str | None:
+    if isinstance(val, dict):
+        return (val.get("name") or val.get("localizedName") or "").strip() or None
+    return None
+
 def _extract_type_from_issue(issue: Dict[str, Any]) -> str | None:
     """
     Pull a type-like value.
     Matches 'Type', 'Issue Type' (case-insensitive). Falls back to None.
     """
-    for cf in issue.get("customFields", []):
-        cf_name = (cf.get("name") or "").strip().lower()
-        if cf_name in ("type", "issue type", "issuetype"):
-            val = cf.get("value")
-            if isinstance(val, dict):
-                name = (val.get("name") or val.get("localizedName") or "").strip()
-                return name or None
-            return None
+    for cf in issue.get("customFields") or []:
+        if (cf.get("name") or "").strip().lower() in _TYPE_FIELD_NAMES:
+            return _cf_value_name(cf.get("value"))
     return None
 
-def _extract_state_from_issue(issue: Dict[str, Any]) -> str | None:
-    for cf in issue.get("customFields", []):
-        if (cf.get("name") or "").strip().lower() == "state":
-            val = cf.get("value")
-            if isinstance(val, dict):
-                return (val.get("name") or val.get("localizedName") or "").strip() or None
-            return None
-    return None
+def _extract_type_and_state(issue: Dict[str, Any]) -> tuple[str | None, str | None]:
+    """
+    (type, state) from a single pass over customFields; each field name is
+    normalised once and the loop stops as soon as both have been seen.
+    The first matching field wins, as with separate scans.
+    """
+    itype = istate = None
+    have_type = have_state = False
+    for cf in issue.get("customFields") or []:
+        name = (cf.get("name") or "").strip().lower()
+        if not have_type and name in _TYPE_FIELD_NAMES:
+            itype, have_type = _cf_value_name(cf.get("value")), True
+        elif not have_state and name == "state":
+            istate, have_state = _cf_value_name(cf.get("value")), True
+        else:
+            continue
+        if have_type and have_state:
+            break
+    return itype, istate
+
+@ttl_cache(300, stale_while_revalidate=True)
+def _fetch_issues_for_period(start: date, end: date) -> Dict[str, Any]:
+    """
+    Fetch the period's issues once, reduced to what the count views need:
+      {
+        "triples": ( ("APLUS", "Bug", "Open"), ... ),   # (project, type, state) per issue
+        "query":   "...",
+        "raw":     N,                                   # issues returned by YouTrack
+      }
+    Filters: projects from config, period on Created Date, subtasks excluded
+    via `has: -{subtask of}`, EXCLUDED_TYPES removed via `Type: -{...}`.
+    Both exclusions happen server-side, so "after_exclude" equals "raw".
+    Keyed on the resolved (start, end) range rather than the period key:
+    periods are month-aligned, so identical ranges share one fetch and a
+    month rollover produces a new key instead of serving last month's data.
+    Cached for 5 minutes (refreshed in the background past half of that) so
+    rendering both views costs one fetch; the per-period-key functions below
+    don't cache on their own, so the range decides which entry is used.
+    `_fetch_issues_for_period.cache_clear()` forces a refetch.
+    """
+    if not ACTIVE_PROJECTS:
+        return {"triples": (), "query": "", "raw": 0}
+
+    created_clause = get_field_range_filter("created", start, end)  # e.g., "created: {2025-08-01} .. {2025-08-31}"
+    proj_clause = _PROJ_CLAUSE
+    no_subtasks_clause = "has: -{subtask of}"
+    excluded_clause = _EXCLUDED_TYPES_CLAUSE
+
+    # Final query (AND is implied by spaces)
+    yt_query = f"{proj_clause} {created_clause} {no_subtasks_clause} {excluded_clause}".strip()
+
+    triples: list[tuple[str, str, str]] = []
+    raw_matches = 0
+    # shortName -> normalised key; only a handful of projects, so strip/upper runs once per project
+    proj_norm: Dict[str, str] = {}
+
+    for issue in _iter_issues_minimal(yt_query):
+        raw_matches += 1
+
+        short = (issue.get("project") or {}).get("shortName") or ""
+        proj = proj_norm.get(short)
+        if proj is None:
+            proj = proj_norm[short] = short.strip().upper()
+        if proj not in _ACTIVE:
+            continue  # missing or not a configured project (e.g. moved since the query matched)
+        itype, istate = _extract_type_and_state(issue)
+        itype = itype or "Unspecified"
+        istate = istate or "Unspecified"
+        triples.append((proj, itype, istate))
+
+    return {"triples": tuple(triples), "query": yt_query, "raw": raw_matches}
+
+
+def _period_debug(fetched: Dict[str, Any]) -> Dict[str, Any]:
+    return {"query": fetched["query"], "raw": fetched["raw"], "after_exclude": fetched["raw"]}
+
 
 def get_task_counts_by_type_and_state(period_key: str) -> Dict[str, Dict[str, Dict[str, int]]]:
     """
@@ -205,60 +523,129 @@ def get_task_counts_by_type_and_state(period_key: str) -> Dict[str, Dict[str, Di
       }
     - Uses same filters as before: projects from config, period on Created Date,
       and subtasks excluded via `has: -{subtask of}`.
-    - Respects EXCLUDED_TYPES (case-insensitive).
+    - Excludes EXCLUDED_TYPES in the query (`Type: -{...}`).
+    Rebuilt from the cached triples on each call (one Counter pass).
     """
-    if not ACTIVE_PROJECTS:
-        return {"per_project": {}, "overall": {}, "debug": {"query": "", "raw": 0, "after_exclude": 0}}
+    fetched = _fetch_issues_for_period(*get_period_range(period_key))
 
-    created_clause = get_created_filter(period_key)
-    proj_clause = _build_projects_or_clause(ACTIVE_PROJECTS)
-    no_subtasks_clause = "has: -{subtask of}"
-    yt_query = f"{proj_clause} {created_clause} {no_subtasks_clause}".strip()
+    per_project: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(lambda: defaultdict(dict))
+    overall: Dict[str, Counter] = defaultdict(Counter)
+    for (proj, itype, istate), n in Counter(fetched["triples"]).items():
+        per_project[proj][itype][istate] = n
+        overall[itype][istate] += n
 
-    per_project: Dict[str, Dict[str, Dict[str, int]]] = {p: {} for p in ACTIVE_PROJECTS}
-    overall: Dict[str, Dict[str, int]] = {}
+    # Back to plain dicts: configured projects first (even when empty), keys in first-seen order
+    return {
+        "per_project": {p: {t: dict(s) for t, s in per_project[p].items()} for p in ACTIVE_PROJECTS},
+        "overall": {t: dict(s) for t, s in overall.items()},
+        "debug": _period_debug(fetched),
+    }
 
-    raw_matches = 0
-    after_exclude = 0
 
-    for issue in _iter_issues_minimal(yt_query):
-        raw_matches += 1
+def _build_projects_or_clause(projects: List[str]) -> str:
+    """
+    Build a project filter. In YouTrack, repeating the same attribute is OR.
+    Example: project:{APLUS} project:{AT}
+    """
+    parts = [f"project:{{{p}}}" for p in projects if p]
+    return " ".join(parts) if parts else ""
 
-        itype = _extract_type_from_issue(issue) or "Unspecified"
-        if itype.strip().lower() in EXCLUDED_TYPES:
-            continue
+# ACTIVE_PROJECTS is fixed at import, so its clause is too
+_PROJ_CLAUSE = _build_projects_or_clause(ACTIVE_PROJECTS)
 
-        istate = _extract_state_from_issue(issue) or "Unspecified"
-        proj = ((issue.get("project") or {}).get("shortName") or "").strip().upper()
-        if not proj:
-            continue
 
-        # per project
-        per_project.setdefault(proj, {})
-        per_project[proj].setdefault(itype, {})
-        per_project[proj][itype][istate] = per_project[proj][itype].get(istate, 0) + 1
+def _build_excluded_types_clause(types: Iterable[str]) -> str:
+    """
+    Build a Type exclusion filter so excluded issues never leave the server.
+    Example: Type: -{Deployment} Type: -{Tech Task}
+    """
+    parts = [f"Type: -{{{t}}}" for t in types if t]
+    return " ".join(parts) if parts else ""
 
-        # overall
-        overall.setdefault(itype, {})
-        overall[itype][istate] = overall[itype].get(istate, 0) + 1
+# Same for EXCLUDED_TYPES: the exclusion is part of every count query, never a per-issue check
+_EXCLUDED_TYPES_CLAUSE = _build_excluded_types_clause(EXCLUDED_TYPES)
 
-        after_exclude += 1
 
-    return {
-        "per_project": per_project,
-        "overall": overall,
-        "debug": {"query": yt_query, "raw": raw_matches, "after_exclude": after_exclude},
-    }
 
+_COUNT_WORKERS = 8
 
-def _build_projects_or_clause(projects: List[str]) -> str:
+# Cleared once the count path fails (no admin access for the Type bundles,
+# count endpoint missing or erroring), so later calls stream right away
+# instead of paying the failing requests again. Streaming is always correct.
+_COUNT_PATH_OK = True
+
+def _counts_by_type_via_count(start: date, end: date) -> Dict[str, Any] | None:
     """
-    Build a project filter. In YouTrack, repeating the same attribute is OR.
-    Example: project:{APLUS} project:{AT}
+    Per-(project, Type) counts from the count endpoint, fired concurrently:
+    one count per project (all Types) plus one per Type in the project's Type
+    bundle; issues without a Type are the remainder ("Unspecified").
+    Only used when that fan-out takes fewer requests than streaming the
+    period's pages (one total count up front decides).
+    Returns None when it doesn't pay off, or when a project's Types or any
+    count is unavailable (the latter also clears _COUNT_PATH_OK).
     """
-    parts = [f"project:{{{p}}}" for p in projects if p]
-    return " ".join(parts) if parts else ""
+    global _COUNT_PATH_OK
+    if not _COUNT_PATH_OK:
+        return None
+
+    excluded = {t.lower() for t in EXCLUDED_TYPES}
+    types_by_project: Dict[str, list[str]] = {}
+    for proj in ACTIVE_PROJECTS:
+        try:
+            types = [t for t in fetch_task_types(proj) if t.lower() not in excluded]
+        except Exception:
+            _COUNT_PATH_OK = False
+            return None
+        if not types:
+            return None
+        types_by_project[proj] = types
+
+    created_clause = get_field_range_filter("created", start, end)
+    base_clause = f"{created_clause} has: -{{subtask of}}"
+    # Only the totals carry the exclusion: next to `Type:{X}` a second Type
+    # clause would be OR-ed, and `types` already leaves EXCLUDED_TYPES out
+    total_clause = f"{base_clause} {_EXCLUDED_TYPES_CLAUSE}".strip()
+
+    # Streaming costs one request per page; the fan-out one per (project, Type) plus totals
+    expected = _count_issues(f"{_PROJ_CLAUSE} {total_clause}".strip())
+    if expected is None:
+        _COUNT_PATH_OK = False
+        return None
+    fan_out = sum(1 + len(types) for types in types_by_project.values())
+    if fan_out > max(1, -(-expected // _PAGE_SIZE)):
+        return None
+
+    with ThreadPoolExecutor(max_workers=_COUNT_WORKERS) as pool:
+        jobs = {}
+        for proj, types in types_by_project.items():
+            jobs[(proj, None)] = pool.submit(_count_issues, f"project:{{{proj}}} {total_clause}")
+            for itype in types:
+                jobs[(proj, itype)] = pool.submit(
+                    _count_issues, f"project:{{{proj}}} Type:{{{itype}}} {base_clause}"
+                )
+        counts = {key: fut.result() for key, fut in jobs.items()}
+    if any(n is None for n in counts.values()):
+        _COUNT_PATH_OK = False
+        return None
 
+    per_project: Dict[str, Dict[str, int]] = {p: {} for p in ACTIVE_PROJECTS}
+    overall: Counter = Counter()
+    total = 0
+    for proj, types in types_by_project.items():
+        by_type = {t: counts[(proj, t)] for t in types if counts[(proj, t)]}
+        unspecified = counts[(proj, None)] - sum(by_type.values())
+        if unspecified > 0:
+            by_type["Unspecified"] = unspecified
+        per_project[proj] = by_type
+        overall.update(by_type)
+        total += counts[(proj, None)]
+
+    query = f"{_PROJ_CLAUSE} {total_clause}".strip()
+    return {
+        "per_project": per_project,
+        "overall": dict(overall),
+        "debug": {"query": query, "raw": total, "after_exclude": total},
+    }
 
 
 # ---- Public: counts by Type (subtasks excluded in query) ----
@@ -267,7 +654,7 @@ def get_task_counts_by_type(period_key: str) -> Dict[str, Dict[str, Any]]:
     Return counts by Type for all configured projects, with:
       • Created-date period filter
       • Subtasks excluded via query:  has: -{subtask of}
-      • Types in config.EXCLUDED_TYPES removed (case-insensitive)
+      • Types in config.EXCLUDED_TYPES excluded via query:  Type: -{Deployment}
 
     Output:
       {
@@ -275,67 +662,62 @@ def get_task_counts_by_type(period_key: str) -> Dict[str, Dict[str, Any]]:
         "overall":     { "Bug": 18, "Enhancement": 9, ... },
         "debug":       { "query": "...", "raw": 0, "after_exclude": 0 }
       }
+    Counts come from YouTrack's count endpoint (no issue payloads); if that
+    is unavailable, the period's issues are streamed and counted instead.
     """
-    if not ACTIVE_PROJECTS:
-        return {"per_project": {}, "overall": {}, "debug": {"query": "", "raw": 0, "after_exclude": 0}}
+    return _task_counts_by_type_for_range(*get_period_range(period_key))
 
-    created_clause = get_created_filter(period_key)  # e.g., "created: {2025-08-01} .. {2025-08-31}"
-    proj_clause = _build_projects_or_clause(ACTIVE_PROJECTS)
 
-    # Exclude subtasks directly in the YouTrack query
-    no_subtasks_clause = "has: -{subtask of}"
+# Keyed on the resolved range like _fetch_issues_for_period
+@ttl_cache(300, stale_while_revalidate=True)
+def _task_counts_by_type_for_range(start: date, end: date) -> Dict[str, Dict[str, Any]]:
+    if ACTIVE_PROJECTS:
+        via_count = _counts_by_type_via_count(start, end)
+        if via_count is not None:
+            return via_count
 
-    # Final query (AND is implied by spaces)
-    yt_query = f"{proj_clause} {created_clause} {no_subtasks_clause}".strip()
+    fetched = _fetch_issues_for_period(start, end)
 
+    # Configured projects first, even when empty; keys follow first appearance
     per_project: Dict[str, Dict[str, int]] = {p: {} for p in ACTIVE_PROJECTS}
-    overall: Dict[str, int] = {}
-
-    raw_matches = 0
-    after_exclude = 0
-
-    for issue in _iter_issues_minimal(yt_query):
-        raw_matches += 1
-
-        itype = _extract_type_from_issue(issue)
-        if not itype:
-            itype = "Unspecified"
-
-        # Exclude by configured types (case-insensitive)
-        if itype.strip().lower() in EXCLUDED_TYPES:
-            continue
-        after_exclude += 1
-
-        proj = ((issue.get("project") or {}).get("shortName") or "").strip().upper()
-        if not proj:
-            continue
-
-        per_project.setdefault(proj, {})
-        per_project[proj][itype] = per_project[proj].get(itype, 0) + 1
-        overall[itype] = overall.get(itype, 0) + 1
+    for (proj, itype), n in Counter((p, t) for p, t, _ in fetched["triples"]).items():
+        per_project[proj][itype] = n
+    overall = dict(Counter(t for _, t, _ in fetched["triples"]))
 
-    return {
-        "per_project": per_project,
-        "overall": overall,
-        "debug": {
-            "query": yt_query,
-            "raw": raw_matches,
-            "after_exclude": after_exclude,
-        },
-    }
+    return {"per_project": per_project, "overall": overall, "debug": _period_debug(fetched)}
 
 
 # ================== Section 3: Deployments on Live (backend) ==================
-from period_utils import get_field_period_filter
-from datetime import datetime, timezone
-import re
 
 # Lock to what your instance shows in debug: Relates, Subtask (skip Duplicate)
 _DEPLOYMENT_LINK_TYPES = {"relates", "subtask"}
 
+# Fallback /links and resolve requests run concurrently (network-bound; results are merged in order)
+_LINKS_WORKERS = 8
+
+# Field specs (constant; shared by the requests below)
+_LINKED_ISSUE_FIELDS = (
+    "  idReadable,id,summary,created,project(shortName),"
+    "  customFields(name,value(name,localizedName))"
+)
+# Include internal id so fallback /links call works
+_DEPLOYMENT_FIELDS = (
+    "idReadable,id,summary,created,dueDate,"
+    "customFields(name,value(name,localizedName,date)),"
+    "links(direction,linkType(name),issues(" + _LINKED_ISSUE_FIELDS + "))"
+)
+_LINKS_PARAMS = {"fields": "direction,linkType(name),issues(" + _LINKED_ISSUE_FIELDS + ")"}
+# One issue row (resolved links, business review)
+_ISSUE_ROW_FIELDS = (
+    "idReadable,summary,created,project(shortName),"
+    "customFields(name,value(name,localizedName))"
+)
+_RESOLVE_PARAMS = {"fields": _ISSUE_ROW_FIELDS}
+
 _KEY_RE = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$")
+_KEY_MATCH = _KEY_RE.match  # bound once; used inline in the per-link loops
 def _is_valid_issue_key(s: str) -> bool:
-    return bool(s) and bool(_KEY_RE.match(s))
+    return bool(s) and bool(_KEY_MATCH(s))
 
 
 def get_deployments_on_live(
@@ -354,73 +736,99 @@ def get_deployments_on_live(
     no_subtasks_clause = "has: -{subtask of}"
     yt_query = f"{proj_clause} Type:{{Deployment}} {due_clause} {no_subtasks_clause}".strip()
 
-    # Include internal id so fallback /links call works
-    fields = (
-        "idReadable,id,summary,dueDate,"
-        "customFields(name,value(name,localizedName,date)),"
-        "links(direction,linkType(name),issues("
-        "  idReadable,id,summary,created,project(shortName),"
-        "  customFields(name,value(name,localizedName))"
-        "))"
-    )
-
     # Allowed link types
     allowed = None if discover_link_types else {s.strip().lower() for s in (link_types or _DEPLOYMENT_LINK_TYPES)}
     seen_link_types: set[str] = set()
     deployments: list[dict] = []
+    inline_candidates: list[list[dict]] = []  # per deployment, in order
+    needs_links: list[tuple[int, str]] = []  # (deployment index, internal id)
 
-    for dep in _iter_issues_with_fields(yt_query, fields=fields, page_size=100):
+    for dep in _iter_issues_with_fields(yt_query, fields=_DEPLOYMENT_FIELDS):
         dep_id_readable = dep.get("idReadable") or ""
         dep_dbid = dep.get("id") or ""  # internal YouTrack id
         title = dep.get("summary") or ""
         due_iso = _extract_due_date_iso(dep)
 
-        linked_out: list[dict] = []
-        seen_ids: set[str] = set()  # track final readable keys to avoid duplicates
-
-        # ---- A) Try inline-expanded links first
-        inline_links = dep.get("links") or []
-        inline_count = _collect_links_into(
-            inline_links, allowed, seen_link_types, seen_ids, linked_out
-        )
+        # ---- A) Inline-expanded links first
+        candidates = _link_candidates(dep.get("links") or [], allowed, seen_link_types)
+        inline_candidates.append(candidates)
 
-        # ---- B) Fallback: call /api/issues/{<internal id>}/links if needed
-        if inline_count == 0 and dep_dbid:
-            try:
-                params = {
-                    "fields": (
-                        "direction,linkType(name),issues("
-                        "  idReadable,id,summary,created,project(shortName),"
-                        "  customFields(name,value(name,localizedName))"
-                        ")"
-                    )
-                }
-                direct_links = _get(f"/api/issues/{dep_dbid}/links", params=params) or []
-                _collect_links_into(direct_links, allowed, seen_link_types, seen_ids, linked_out)
-            except Exception:
-                pass  # still return the deployment row even if fallback fails
+        # ---- B) Fallback /api/issues/{<internal id>}/links when no inline link is certain
+        # to be kept (a valid readable key always is); fetched below
+        if dep_dbid and not any(_KEY_MATCH(cand["id"]) for cand in candidates):
+            needs_links.append((len(deployments), dep_dbid))
 
         deployments.append({
             "deployment_id": dep_id_readable,
             "deployment_title": title,
             "due_date": due_iso,
-            "linked": linked_out,
+            "linked": [],
         })
 
+    # ---- B) Fallback requests overlap in a small pool; parsing stays on this thread
+    fallback_candidates: Dict[int, tuple[list[dict], set[str]]] = {}
+    if needs_links:
+        with ThreadPoolExecutor(max_workers=min(_LINKS_WORKERS, len(needs_links))) as pool:
+            futures = [
+                pool.submit(_get, f"/api/issues/{dep_dbid}/links", params=_LINKS_PARAMS)
+                for _, dep_dbid in needs_links
+            ]
+            for (idx, _), fut in zip(needs_links, futures):
+                try:
+                    types_seen: set[str] = set()
+                    fallback_candidates[idx] = (
+                        _link_candidates(fut.result() or [], allowed, types_seen), types_seen,
+                    )
+                except Exception:
+                    pass  # still return the deployment row even if fallback fails
+
+    # ---- C) Resolve incomplete linked issues of all deployments in one concurrent batch
+    resolve_keys = [cand["resolve_key"] for cands in inline_candidates for cand in cands]
+    resolve_keys += [cand["resolve_key"] for cands, _ in fallback_candidates.values() for cand in cands]
+    resolved_by_key = _resolve_issues(list(dict.fromkeys(k for k in resolve_keys if k)))
+
+    # ---- D) Fill/validate/dedupe per deployment; fallback links only when no inline one was kept
+    for idx, dep_row in enumerate(deployments):
+        linked_out = dep_row["linked"]
+        seen_ids: set[str] = set()  # track final readable keys to avoid duplicates
+        inline_count = _append_linked(inline_candidates[idx], resolved_by_key, seen_ids, linked_out)
+        fallback = fallback_candidates.get(idx)
+        if inline_count == 0 and fallback is not None:
+            _append_linked(fallback[0], resolved_by_key, seen_ids, linked_out)
+            seen_link_types.update(fallback[1])
+
     debug = {"query": yt_query, "count": len(deployments)}
     if discover_link_types:
         debug["link_types_seen"] = sorted(seen_link_types)
     return {"deployments": deployments, "debug": debug}
 
 
-def _collect_links_into(links_payload, allowed, seen_link_types, seen_ids, linked_out) -> int:
+def _resolve_issues(keys: list[str]) -> Dict[str, dict]:
     """
-    Parse a links collection and append resolved linked issues into linked_out.
-    - Validates readable keys (e.g., APLUS-1234); resolves weird keys via internal id.
-    - Skips items that cannot be resolved to a proper readable key.
-    Returns how many linked issues were appended.
+    Fetch full issue payloads for the given ids concurrently.
+    Returns {key: payload}; keys whose request fails are left out.
     """
-    appended = 0
+    if not keys:
+        return {}
+    resolved: Dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=min(_LINKS_WORKERS, len(keys))) as pool:
+        futures = {key: pool.submit(_get, f"/api/issues/{key}", params=_RESOLVE_PARAMS) for key in keys}
+        for key, fut in futures.items():
+            try:
+                resolved[key] = fut.result() or {}
+            except Exception:
+                pass  # ignore; the key is validated by the caller
+    return resolved
+
+
+def _link_candidates(links_payload, allowed, seen_link_types) -> list[dict]:
+    """
+    Parse a links collection into candidate linked issues, taking what the
+    payload already carries. Items with a weird/missing readable key or missing
+    basic fields get a `resolve_key` (internal id preferred); the caller resolves
+    those for all deployments at once and then calls _append_linked.
+    """
+    candidates: list[dict] = []
     for link in links_payload or []:
         ltype_raw = ((link.get("linkType") or {}).get("name") or "").strip()
         ltype = ltype_raw.lower()
@@ -434,85 +842,93 @@ def _collect_links_into(links_payload, allowed, seen_link_types, seen_ids, linke
             iid_readable = (li.get("idReadable") or "").strip()
             iid_internal = (li.get("id") or "").strip()
             project_short = ((li.get("project") or {}).get("shortName") or "").strip().upper()
-            itype = _extract_type_from_issue(li)
-            istate = _extract_state_from_issue(li)
+            itype, istate = _extract_type_and_state(li)
             title = (li.get("summary") or "").strip()
 
             # created_on from ms -> YYYY-MM-DD
             created_iso = ""
             created_ms = li.get("created")
             if isinstance(created_ms, (int, float)) and created_ms > 0:
-                created_iso = datetime.fromtimestamp(created_ms / 1000.0, tz=timezone.utc).date().isoformat()
+                created_iso = _ms_to_iso_date(created_ms)
 
             # Decide whether we must resolve:
             # - weird or missing readable key, or
             # - missing basic fields (project/type/state/title/created_on)
-            needs_resolve = (not _is_valid_issue_key(iid_readable)) or (not project_short or not itype or not istate)
-
-            if needs_resolve:
-                issue_key = iid_internal or iid_readable  # prefer internal id
-                try:
-                    resolved = _get(
-                        f"/api/issues/{issue_key}",
-                        params={
-                            "fields": "idReadable,summary,created,project(shortName),"
-                                      "customFields(name,value(name,localizedName))"
-                        },
-                    ) or {}
-                    # Fill/override from resolved payload
-                    iid_readable = (resolved.get("idReadable") or "").strip() or iid_readable
-                    project_short = project_short or ((resolved.get("project") or {}).get("shortName") or "").strip().upper()
-                    itype = itype or _extract_type_from_issue(resolved) or "Unspecified"
-                    istate = istate or _extract_state_from_issue(resolved) or "Unspecified"
-                    title = title or (resolved.get("summary") or "").strip()
-                    if not created_iso:
-                        r_ms = resolved.get("created")
-                        if isinstance(r_ms, (int, float)) and r_ms > 0:
-                            created_iso = datetime.fromtimestamp(r_ms / 1000.0, tz=timezone.utc).date().isoformat()
-                except Exception:
-                    # ignore; we'll validate key below
-                    pass
-
-            # If after resolve we still don't have a proper readable key, skip this entry
-            if not _is_valid_issue_key(iid_readable):
-                continue
+            needs_resolve = (
+                not iid_readable or _KEY_MATCH(iid_readable) is None
+                or not project_short or not itype or not istate
+            )
 
-            # Dedup on final readable key
-            if iid_readable in seen_ids:
-                continue
-            seen_ids.add(iid_readable)
-
-            linked_out.append({
+            candidates.append({
                 "id": iid_readable,
                 "project": project_short,
-                "type": itype or "Unspecified",
-                "state": istate or "Unspecified",
+                "type": itype,
+                "state": istate,
                 "title": title,
                 "created_on": created_iso,
+                "resolve_key": (iid_internal or iid_readable) if needs_resolve else "",  # prefer internal id
             })
-            appended += 1
+    return candidates
+
+
+def _append_linked(candidates, resolved_by_key, seen_ids, linked_out) -> int:
+    """
+    Fill candidates from their resolved payloads and append them into linked_out.
+    - Validates readable keys (e.g., APLUS-1234).
+    - Skips items that cannot be resolved to a proper readable key.
+    Returns how many linked issues were appended.
+    """
+    appended = 0
+    for cand in candidates:
+        iid_readable = cand["id"]
+        project_short, itype, istate = cand["project"], cand["type"], cand["state"]
+        title, created_iso = cand["title"], cand["created_on"]
+
+        resolved = resolved_by_key.get(cand["resolve_key"]) if cand["resolve_key"] else None
+        if resolved is not None:
+            # Fill/override from resolved payload
+            iid_readable = (resolved.get("idReadable") or "").strip() or iid_readable
+            project_short = project_short or ((resolved.get("project") or {}).get("shortName") or "").strip().upper()
+            r_type, r_state = _extract_type_and_state(resolved)
+            itype = itype or r_type or "Unspecified"
+            istate = istate or r_state or "Unspecified"
+            title = title or (resolved.get("summary") or "").strip()
+            if not created_iso:
+                r_ms = resolved.get("created")
+                if isinstance(r_ms, (int, float)) and r_ms > 0:
+                    created_iso = _ms_to_iso_date(r_ms)
+
+        # If after resolve we still don't have a proper readable key, skip this entry
+        if not iid_readable or _KEY_MATCH(iid_readable) is None:
+            continue
+
+        # Dedup on final readable key
+        if iid_readable in seen_ids:
+            continue
+        seen_ids.add(iid_readable)
+
+        linked_out.append({
+            "id": iid_readable,
+            "project": project_short,
+            "type": itype or "Unspecified",
+            "state": istate or "Unspecified",
+            "title": title,
+            "created_on": created_iso,
+        })
+        appended += 1
     return appended
 
 
-def _iter_issues_with_fields(yt_query: str, *, fields: str, page_size: int = 100):
-    skip = 0
-    while True:
-        params = {"query": yt_query, "fields": fields, "$top": page_size, "$skip": skip}
-        batch = _get("/api/issues", params=params)
-        if not batch:
-            break
-        for item in batch:
-            yield item
-        if len(batch) < page_size:
-            break
-        skip += page_size
+def _iter_issues_with_fields(yt_query: str, *, fields: str, page_size: int = _PAGE_SIZE):
+    # Link expansions make these pages heavy; same paging and backoff as _iter_issues_minimal
+    return _iter_issue_pages({"query": yt_query, "fields": fields}, page_size)
 
 
 def _extract_due_date_iso(issue) -> str | None:
     ms = issue.get("dueDate")
     if isinstance(ms, (int, float)) and ms > 0:
         try:
-            return datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).date().isoformat()
+            return _ms_to_iso_date(ms)
         except Exception:
             pass
     for f in issue.get("customFields", []) or []:
@@ -520,13 +936,13 @@ def _extract_due_date_iso(issue) -> str | None:
             v = f.get("value")
             if isinstance(v, (int, float)) and v > 0:
                 try:
-                    return datetime.fromtimestamp(v / 1000.0, tz=timezone.utc).date().isoformat()
+                    return _ms_to_iso_date(v)
                 except Exception:
                     return None
             if isinstance(v, dict):
                 if "date" in v and isinstance(v["date"], (int, float)) and v["date"] > 0:
                     try:
-                        return datetime.fromtimestamp(v["date"] / 1000.0, tz=timezone.utc).date().isoformat()
+                        return _ms_to_iso_date(v["date"])
                     except Exception:
                         return None
                 s = (v.get("name") or "").strip()
@@ -547,7 +963,36 @@ def _extract_due_date_iso(issue) -> str | None:
 
 
 # ================== Section 4: Tasks in Business Review ==================
-from datetime import datetime, timezone
+
+_STATE_OR_CLAUSE = "(State:{Business Review} or State:{In Business Review})"
+_STATE_SINGLE_CLAUSE = "State:{In Business Review}"
+
+# Whether this YouTrack instance accepts the parenthesized OR clause (None = not probed yet)
+_SUPPORTS_OR_CLAUSE: bool | None = None
+
+def _supports_or_clause(project: str) -> bool:
+    """
+    Probe the OR clause once with a one-issue request and remember the answer,
+    so later calls build the right query up front instead of failing first.
+    Only a 400 (query rejected) is remembered; other errors are re-probed next time.
+    """
+    global _SUPPORTS_OR_CLAUSE
+    if _SUPPORTS_OR_CLAUSE is None:
+        try:
+            _get("/api/issues", params={
+                "query": f"project: {{{project}}} {_STATE_OR_CLAUSE}",
+                "fields": "id",
+                "$top": 1,
+            })
+            _SUPPORTS_OR_CLAUSE = True
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 400:
+                _SUPPORTS_OR_CLAUSE = False
+            else:
+                return True  # unknown; let the query below decide (it still falls back)
+        except requests.RequestException:
+            return True
+    return _SUPPORTS_OR_CLAUSE
 
 def get_tasks_in_business_review(project: str) -> dict:
     """
@@ -560,33 +1005,26 @@ def get_tasks_in_business_review(project: str) -> dict:
     proj_clause = f"project: {{{project}}}"
     no_subtasks_clause = "has: -{subtask of}"
 
-    # Try the OR clause (parenthesized), fall back to single state if the OR form 400s in your instance.
-    state_or_clause = "(State:{Business Review} or State:{In Business Review})"
-    state_single_clause = "State:{In Business Review}"
-
-    # First attempt with OR
-    yt_query = f"{proj_clause} {state_or_clause} {no_subtasks_clause}".strip()
-
-    fields = (
-        "idReadable,summary,created,project(shortName),"
-        "customFields(name,value(name,localizedName))"
-    )
+    # OR clause (parenthesized) where the instance accepts it, else the single state
+    state_clause = _STATE_OR_CLAUSE if _supports_or_clause(project) else _STATE_SINGLE_CLAUSE
+    yt_query = f"{proj_clause} {state_clause} {no_subtasks_clause}".strip()
 
     items: list[dict] = []
 
     def _collect(query: str) -> list[dict]:
         out = []
-        for it in _iter_issues_with_fields(query, fields=fields, page_size=100):
+        for it in _iter_issues_with_fields(query, fields=_ISSUE_ROW_FIELDS):
             iid = (it.get("idReadable") or "").strip()
             if not iid:
                 continue
             title = (it.get("summary") or "").strip()
-            itype = _extract_type_from_issue(it) or "Unspecified"
-            istate = _extract_state_from_issue(it) or "Unspecified"
+            itype, istate = _extract_type_and_state(it)
+            itype = itype or "Unspecified"
+            istate = istate or "Unspecified"
             created_iso = ""
             ms = it.get("created")
             if isinstance(ms, (int, float)) and ms > 0:
-                created_iso = datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).date().isoformat()
+                created_iso = _ms_to_iso_date(ms)
             out.append({
                 "id": iid,
                 "title": title,
@@ -599,9 +1037,11 @@ def get_tasks_in_business_review(project: str) -> dict:
     try:
         items = _collect(yt_query)
         debug_query = yt_query
-    except requests.HTTPError as e:
-        # If the OR form is not accepted, retry with the single-state clause
-        yt_query_single = f"{proj_clause} {state_single_clause} {no_subtasks_clause}".strip()
+    except requests.HTTPError:
+        if state_clause == _STATE_SINGLE_CLAUSE:
+            raise
+        # The OR form was not accepted after all; retry with the single-state clause
+        yt_query_single = f"{proj_clause} {_STATE_SINGLE_CLAUSE} {no_subtasks_clause}".strip()
         items = _collect(yt_query_single)
         debug_query = yt_query_single
 